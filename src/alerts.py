@@ -0,0 +1,319 @@
+import argparse
+import json
+import os
+import sys
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# --- 高频价格提醒 ---
+# 每个 (币种, 指标) 维护两条按阈值排序的索引 ("above" / "below")。
+# 每次行情 tick 只用 bisect 找出上次值与本次值之间被穿越的阈值，
+# 复杂度 O(log n + 命中数)，不需要遍历全部提醒。
+# 提醒定义、各指标上次的值、冷却时间与未送达的提醒都持久化到 output/alerts_state.json，重启后继续。
+# config.yaml 的 alerts 是提醒定义的唯一来源：启动时状态文件中配置里已删除的提醒会被清掉。
+#
+# 提醒示例 (config.yaml 的 alerts 或 engine.add):
+#   {"id": "btc-70k", "symbol": "BTC", "metric": "price", "op": "above", "threshold": 70000}
+#   {"id": "sol-1h-dump", "symbol": "SOL", "metric": "change_1h", "op": "below", "threshold": -5,
+#    "cooldown": 3600, "to": "me@example.com"}
+
+METRICS = ("price", "change_1h", "change_24h")
+OPS = ("above", "below")
+DEFAULT_COOLDOWN = 1800
+
+
+class Alert:
+    __slots__ = ("id", "symbol", "metric", "op", "threshold", "cooldown", "to", "note")
+
+    def __init__(self, id: str, symbol: str, metric: str = "price", op: str = "above", threshold: float = 0,
+                 cooldown: int = DEFAULT_COOLDOWN, to: str = "", note: str = ""):
+        if metric not in METRICS:
+            raise ValueError(f"不支持的指标: {metric}")
+        if op not in OPS:
+            raise ValueError(f"不支持的方向: {op}")
+        self.id = str(id)
+        self.symbol = symbol.upper()
+        self.metric = metric
+        self.op = op
+        self.threshold = float(threshold)
+        self.cooldown = int(cooldown)
+        self.to = to or ""
+        self.note = note or ""
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "Alert":
+        return cls(**{k: d[k] for k in cls.__slots__ if k in d})
+
+    def to_dict(self) -> Dict:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def _fmt(self, value: float) -> str:
+        if self.metric != "price":
+            return f"{value:.2f}%"
+        # 价格按量级取精度：大额币种保留两位小数，小额币种保留有效数字
+        if abs(value) >= 1:
+            return f"${value:,.2f}"
+        return "$" + (f"{value:.8f}".rstrip("0").rstrip(".") or "0")
+
+    def describe(self, value: float) -> str:
+        cmp = "≥" if self.op == "above" else "≤"
+        return f"{self.symbol} {self.metric} {self._fmt(value)} ({cmp} {self._fmt(self.threshold)})"
+
+
+class _SortedIndex:
+    """阈值有序数组 + 对应的提醒 id，插入/删除 O(n)，查询 O(log n)"""
+    __slots__ = ("keys", "ids")
+
+    def __init__(self):
+        self.keys: List[float] = []
+        self.ids: List[str] = []
+
+    def add(self, threshold: float, alert_id: str) -> None:
+        i = bisect_right(self.keys, threshold)
+        self.keys.insert(i, threshold)
+        self.ids.insert(i, alert_id)
+
+    def remove(self, threshold: float, alert_id: str) -> None:
+        i = bisect_left(self.keys, threshold)
+        while i < len(self.keys) and self.keys[i] == threshold:
+            if self.ids[i] == alert_id:
+                del self.keys[i]
+                del self.ids[i]
+                return
+            i += 1
+
+    def between(self, lo: float, hi: float, lo_inclusive: bool, hi_inclusive: bool) -> List[str]:
+        start = bisect_left(self.keys, lo) if lo_inclusive else bisect_right(self.keys, lo)
+        end = bisect_right(self.keys, hi) if hi_inclusive else bisect_left(self.keys, hi)
+        return self.ids[start:end]
+
+
+class AlertEngine:
+    def __init__(self, state_path: str = os.path.join("output", "alerts_state.json")):
+        self.state_path = state_path
+        self.alerts: Dict[str, Alert] = {}
+        self._index: Dict[tuple, _SortedIndex] = {}
+        # (symbol, metric) -> 上一次观察到的值
+        self.last: Dict[str, float] = {}
+        # alert id -> 上次触发时间戳
+        self.fired_at: Dict[str, float] = {}
+        # 已触发但未送达的提醒 [{"id", "value", "at"}, ...]，下次轮询重发
+        self.pending: List[Dict] = []
+        self._load()
+
+    # --- 注册 ---
+
+    def add(self, alert: Alert) -> None:
+        """注册或更新提醒；条件 (币种/指标/方向/阈值) 不变时保留冷却状态"""
+        old = self.alerts.get(alert.id)
+        if old is not None:
+            self._unindex(old)
+            if (old.symbol, old.metric, old.op, old.threshold) != (alert.symbol, alert.metric, alert.op, alert.threshold):
+                self.fired_at.pop(alert.id, None)
+        self.alerts[alert.id] = alert
+        self._index.setdefault((alert.symbol, alert.metric, alert.op), _SortedIndex()).add(alert.threshold, alert.id)
+
+    def remove(self, alert_id: str) -> None:
+        alert = self.alerts.pop(alert_id, None)
+        if alert is None:
+            return
+        self._unindex(alert)
+        self.fired_at.pop(alert_id, None)
+        self.pending = [p for p in self.pending if p["id"] != alert_id]
+
+    def sync(self, alerts: List[Alert]) -> None:
+        """以配置为准：删除配置中已不存在的提醒，其余新增或更新"""
+        keep = {a.id for a in alerts}
+        for alert_id in [i for i in self.alerts if i not in keep]:
+            self.remove(alert_id)
+        for alert in alerts:
+            self.add(alert)
+
+    def _unindex(self, alert: Alert) -> None:
+        idx = self._index.get((alert.symbol, alert.metric, alert.op))
+        if idx:
+            idx.remove(alert.threshold, alert.id)
+
+    # --- 评估 ---
+
+    def _crossed(self, symbol: str, metric: str, prev: Optional[float], value: float) -> List[str]:
+        hits = []
+        above = self._index.get((symbol, metric, "above"))
+        below = self._index.get((symbol, metric, "below"))
+        if prev is None:
+            # 首次观察：当前已满足条件的提醒都算触发
+            if above:
+                hits += above.between(float("-inf"), value, True, True)
+            if below:
+                hits += below.between(value, float("inf"), True, True)
+            return hits
+        if above and value > prev:
+            # 向上穿越：prev < t <= value
+            hits += above.between(prev, value, False, True)
+        if below and value < prev:
+            # 向下穿越：value <= t < prev
+            hits += below.between(value, prev, True, False)
+        return hits
+
+    def on_tick(self, quotes: List, now: float = None) -> List[Dict]:
+        """处理一次行情快照，返回本次触发的提醒 (已过滤冷却期内的)"""
+        now = now if now is not None else time.time()
+        fired = []
+        for q in quotes:
+            for metric in METRICS:
+                value = getattr(q, metric, None)
+                if value is None:
+                    continue
+                key = f"{q.symbol}:{metric}"
+                prev = self.last.get(key)
+                self.last[key] = value
+                for alert_id in self._crossed(q.symbol, metric, prev, value):
+                    alert = self.alerts[alert_id]
+                    last_fired = self.fired_at.get(alert_id)
+                    if last_fired is not None and now - last_fired < alert.cooldown:
+                        continue
+                    self.fired_at[alert_id] = now
+                    fired.append({"alert": alert, "value": value, "at": now})
+        return fired
+
+    # --- 投递重试 ---
+
+    def defer(self, hits: List[Dict]) -> None:
+        """记下未送达的提醒 (穿越已被 last 记录，不会再次触发，只能靠重发)"""
+        self.pending += [{"id": h["alert"].id, "value": h["value"], "at": h["at"]} for h in hits]
+
+    def take_pending(self) -> List[Dict]:
+        hits = [{"alert": self.alerts[p["id"]], "value": p["value"], "at": p["at"]}
+                for p in self.pending if p["id"] in self.alerts]
+        self.pending = []
+        return hits
+
+    # --- 持久化 ---
+
+    def _load(self) -> None:
+        if not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f) or {}
+        except Exception as e:
+            print(f"[WARN] 提醒状态读取失败，已忽略: {e}")
+            return
+        for d in state.get("alerts") or []:
+            try:
+                self.add(Alert.from_dict(d))
+            except (TypeError, ValueError) as e:
+                print(f"[WARN] 提醒定义无效，已跳过: {d} - {e}")
+        self.last = state.get("last") or {}
+        self.fired_at = {k: v for k, v in (state.get("fired_at") or {}).items() if k in self.alerts}
+        self.pending = [p for p in state.get("pending") or [] if p.get("id") in self.alerts]
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "alerts": [a.to_dict() for a in self.alerts.values()],
+                "last": self.last,
+                "fired_at": self.fired_at,
+                "pending": self.pending,
+            }, f, ensure_ascii=False)
+        os.replace(tmp, self.state_path)
+
+
+def check_recipients(alerts: List[Alert], default_to: str) -> List[str]:
+    """返回没有收件人的提醒说明 (既未配置 to，也没有 EMAIL_TO)"""
+    if default_to:
+        return []
+    return [f"{a.id}: 缺少收件人 (配置 to 或设置 EMAIL_TO)" for a in alerts if not a.to]
+
+
+def build_messages(fired: List[Dict], default_to: str) -> List[Dict]:
+    """按收件人合并本次触发的提醒，每人一封邮件"""
+    by_to: Dict[str, List[Dict]] = {}
+    for hit in fired:
+        by_to.setdefault(hit["alert"].to or default_to, []).append(hit)
+    messages = []
+    for to, hits in by_to.items():
+        lines = [f"- {h['alert'].describe(h['value'])} {h['alert'].note}".rstrip() for h in hits]
+        ts = datetime.fromtimestamp(hits[0]["at"]).strftime("%Y-%m-%d %H:%M:%S")
+        messages.append({
+            "to": to,
+            "subject": f"⏰ Web3 价格提醒: {', '.join(sorted({h['alert'].symbol for h in hits}))}",
+            "body": f"触发时间: {ts}\n\n" + "\n".join(lines),
+            "attachments": [],
+        })
+    return messages
+
+
+def main(argv=None):
+    # 延迟导入，只有运行提醒轮询时才需要网络与邮件依赖
+    from src import health
+    from src.providers.coingecko import CoinGeckoClient
+    from src.senders.email_sender import send_emails
+
+    parser = argparse.ArgumentParser(description="Web3 高频价格提醒")
+    parser.add_argument("--interval", type=int, default=60, help="轮询间隔 (秒)")
+    parser.add_argument("--limit", type=int, default=250, help="拉取市值前 N 的币种")
+    parser.add_argument("--once", action="store_true", help="只轮询一次")
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--state", default=os.path.join("output", "alerts_state.json"))
+    parser.add_argument("--health", default=os.path.join("output", "alerts_health.json"),
+                        help="熔断状态文件 (与日报的 provider_health.json 分开)")
+    args = parser.parse_args(argv)
+
+    # 轮询间隔是分钟级的，熔断冷却也按分钟计，且不与日报共享状态
+    breaker = health.configure(args.health, base_cooldown=max(args.interval * 5, 300),
+                               max_cooldown=3600)
+
+    engine = AlertEngine(args.state)
+    from src.config import load_settings
+    configured = []
+    for d in load_settings(args.config).get("alerts") or []:
+        try:
+            configured.append(Alert.from_dict(d))
+        except (TypeError, ValueError) as e:
+            print(f"[WARN] 提醒定义无效，已跳过: {d} - {e}")
+    engine.sync(configured)
+    if not engine.alerts:
+        print("❌ 没有任何提醒 (config.yaml 的 alerts)")
+        sys.exit(1)
+    default_to = os.getenv("EMAIL_TO", "")
+    problems = check_recipients(list(engine.alerts.values()), default_to)
+    if problems:
+        print("❌ 以下提醒无法投递，请修正配置:")
+        for p in problems:
+            print(f"    - {p}")
+        sys.exit(1)
+    print(f">>> 已加载 {len(engine.alerts)} 条提醒，轮询间隔 {args.interval}s")
+
+    cg = CoinGeckoClient()
+    while True:
+        quotes = cg.fetch_market_data(limit=args.limit, price_change="1h,24h")
+        retry = engine.take_pending()
+        fired = engine.on_tick(quotes) if quotes else []
+        if fired or retry:
+            print(f"🔔 触发 {len(fired)} 条提醒" + (f"，重发 {len(retry)} 条" if retry else ""))
+            hits = retry + fired
+            try:
+                failed = send_emails(build_messages(hits, default_to), env=os.environ)
+            except Exception as e:
+                print(f"❌ 提醒邮件发送失败: {e}")
+                failed = [(h["alert"].to or default_to, str(e)) for h in hits]
+            failed_to = set()
+            for to, err in failed:
+                print(f"❌ {to}: {err}")
+                failed_to.add(to)
+            # 未送达的提醒进入重发队列，下次轮询再发
+            engine.defer([h for h in hits if (h["alert"].to or default_to) in failed_to])
+        engine.save()
+        breaker.save()
+        if args.once:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+# --- 分阶段断点 ---
+# 每个阶段 (抓取 / 整理 / 简报 / 报告 / 发送) 的产物按 run id 存到
+# output/runs/<run_id>/ 下。重跑时加 --resume，校验通过的阶段直接读盘，
+# 从第一个缺失或损坏的阶段开始重新执行，且其后的阶段一律重算。
+
+MANIFEST = "manifest.json"
+LATEST = "LATEST"
+
+
+def _sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _encode(o):
+    # 规范化记录 (src.records) 按完整字段落盘，读回后由 hydrate 还原
+    if hasattr(o, "to_dict"):
+        return o.to_dict()
+    return str(o)
+
+
+class RunCheckpoint:
+    def __init__(self, run_id: str, output_dir: str = "output", resume: bool = False):
+        self.run_id = run_id
+        self.resume = resume
+        self.root = os.path.join(output_dir, "runs")
+        self.run_dir = os.path.join(self.root, run_id)
+        os.makedirs(self.run_dir, exist_ok=True)
+        self.manifest = self._load_manifest()
+        # 一旦某个阶段重算，后续阶段的旧产物都不再可信
+        self._dirty = False
+        with open(os.path.join(self.root, LATEST), "w", encoding="utf-8") as f:
+            f.write(run_id)
+
+    @classmethod
+    def open(cls, output_dir: str = "output", resume: Optional[str] = None) -> "RunCheckpoint":
+        """resume 为 None 时新建 run；为 'latest' 时续跑最近一次；否则续跑指定 run id"""
+        if not resume:
+            return cls(datetime.now().strftime("%Y%m%d-%H%M%S"), output_dir)
+        run_id = resume
+        if resume == "latest":
+            latest = os.path.join(output_dir, "runs", LATEST)
+            if not os.path.exists(latest):
+                raise FileNotFoundError(f"没有可续跑的历史记录: {latest}")
+            with open(latest, "r", encoding="utf-8") as f:
+                run_id = f.read().strip()
+        if not os.path.isdir(os.path.join(output_dir, "runs", run_id)):
+            raise FileNotFoundError(f"找不到 run: {run_id}")
+        return cls(run_id, output_dir, resume=True)
+
+    def _load_manifest(self) -> dict:
+        path = os.path.join(self.run_dir, MANIFEST)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f) or {}
+        except Exception:
+            return {}
+
+    def _write_manifest(self) -> None:
+        tmp = os.path.join(self.run_dir, MANIFEST + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, os.path.join(self.run_dir, MANIFEST))
+
+    def is_valid(self, stage: str) -> bool:
+        entry = self.manifest.get(stage)
+        if not entry:
+            return False
+        path = os.path.join(self.run_dir, entry["file"])
+        return os.path.exists(path) and _sha256(path) == entry.get("sha256")
+
+    def save(self, stage: str, value: Any) -> None:
+        file_name = f"{stage}.json"
+        path = os.path.join(self.run_dir, file_name)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(value, f, ensure_ascii=False, default=_encode)
+        os.replace(tmp, path)
+        self.manifest[stage] = {
+            "file": file_name,
+            "sha256": _sha256(path),
+            "saved_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        self._write_manifest()
+
+    def load(self, stage: str) -> Any:
+        with open(os.path.join(self.run_dir, self.manifest[stage]["file"]), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def file_entry(path: Optional[str]) -> Optional[dict]:
+        """记录阶段产出文件的路径与摘要，续跑时据此确认文件未被其它运行覆盖"""
+        if not path or not os.path.exists(path):
+            return None
+        return {"path": path, "sha256": _sha256(path)}
+
+    @staticmethod
+    def file_valid(entry: Optional[dict]) -> bool:
+        return bool(entry) and os.path.exists(entry["path"]) and _sha256(entry["path"]) == entry["sha256"]
+
+    def stage(self, name: str, producer: Callable[[], Any], validator: Callable[[Any], bool] = None) -> Any:
+        """执行一个阶段：续跑模式下若断点有效则直接复用，否则调用 producer 并落盘"""
+        if self.resume and not self._dirty and self.is_valid(name):
+            value = self.load(name)
+            if validator is None or validator(value):
+                print(f"    ↪ [断点] 复用阶段 {name} ({self.run_id})")
+                return value
+        self._dirty = True
+        value = producer()
+        self.save(name, value)
+        return value
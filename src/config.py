@@ -1,7 +1,12 @@
 import os
 from pathlib import Path
-import yaml
-from dotenv import load_dotenv
+
+try:
+    import yaml
+    from dotenv import load_dotenv
+except ImportError as e:  # 日报 workflow 只安装了最小依赖，见 load_settings
+    yaml = load_dotenv = None
+    _IMPORT_ERROR = e
 
 
 def load_config(config_path: str = "config.yaml") -> dict:
@@ -46,6 +51,16 @@ def load_config(config_path: str = "config.yaml") -> dict:
                 }
             },
             "prompt_extra": "",
+            # 多订阅者模式 (python -m src.main --tenants)，示例:
+            # {"name": "alice", "watchlist": ["BTC", "SOL"], "keywords": ["defi"],
+            #  "trigger_keywords": ["airdrop"], "categories": ["market", "news", "air"],
+            #  "channel": {"type": "email", "to": "alice@example.com"}}
+            "subscribers": [],
+            # 信号规则 (见 src/signals.py 顶部说明)；留空则使用内置 DEFAULT_RULES
+            "signal_rules": [],
+            # 价格提醒 (python -m src.alerts)，示例:
+            # {"id": "btc-70k", "symbol": "BTC", "metric": "price", "op": "above", "threshold": 70000}
+            "alerts": [],
         }
 
     # 环境变量注入（OpenAI & 通道）
@@ -86,3 +101,11 @@ def load_config(config_path: str = "config.yaml") -> dict:
         cfg["env"].setdefault("EMAIL_SMTP_PORT", 587)
 
     return cfg
+
+
+def load_settings(config_path: str = "config.yaml") -> dict:
+    """读取 config.yaml；未安装 yaml/dotenv 时回退为空配置"""
+    if yaml is None:
+        print(f"[WARN] 配置加载依赖缺失，使用默认配置: {_IMPORT_ERROR}")
+        return {}
+    return load_config(config_path)
@@ -0,0 +1,199 @@
+import re
+import zlib
+from typing import Callable, Dict, List, Optional, Union
+
+from src.records import Record
+
+# --- 近似去重：Shingling + MinHash + LSH ---
+# 同一条新闻会被多个媒体以略有差异（或翻译过）的标题转发，
+# 精确标题去重挡不住。这里用 MinHash 签名 + LSH 分桶找出候选对，
+# 再对候选对计算 shingle 集合的精确 Jaccard，整体接近线性复杂度。
+# 涉及币种不同的条目 (如 "Coinbase lists PEPE" / "Coinbase lists BONK") 不合并。
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# 中日韩字符按单字切分，其余按单词切分
+_CJK_RE = re.compile(r"[぀-ヿ㐀-䶿一-鿿가-힯]")
+_TOKEN_RE = re.compile(r"[぀-ヿ㐀-䶿一-鿿가-힯]|[a-z0-9$%.]+")
+# 标题中的币种代码 (全大写单词) 与首字母大写的专有名词
+_TICKER_RE = re.compile(r"\b[A-Z][A-Z0-9]{1,9}\b")
+_WORD_RE = re.compile(r"[A-Za-z][A-Za-z0-9]*")
+
+
+def _permutations(num_perm: int, seed: int = 1):
+    """生成固定的 (a, b) 哈希参数，保证跨进程结果一致"""
+    params = []
+    x = seed
+    for _ in range(num_perm):
+        x = (x * 6364136223846793005 + 1442695040888963407) % (1 << 64)
+        a = (x >> 3) % _PRIME or 1
+        x = (x * 6364136223846793005 + 1442695040888963407) % (1 << 64)
+        b = (x >> 3) % _PRIME
+        params.append((a, b))
+    return params
+
+
+def _char_ngrams(run: str, n: int = 3) -> set:
+    # 前后补空格，让短词也能贡献完整的词边界 n-gram
+    run = f" {run} "
+    return {run[i:i + n] for i in range(len(run) - n + 1)}
+
+
+def shingles(text: str) -> set:
+    """把标题切成 shingle 集合：
+    - 中文等 CJK 文本使用字符 2-gram (标题没有空格分词)
+    - 拉丁文本使用字符 3-gram，对单复数、时态、增删介词等改写不敏感
+    """
+    tokens = _TOKEN_RE.findall((text or "").lower())
+    out = set()
+    prev_cjk = None
+    words = []
+    for tok in tokens:
+        if _CJK_RE.match(tok):
+            if words:
+                out |= _char_ngrams(" ".join(words))
+                words = []
+            if prev_cjk:
+                out.add(prev_cjk + tok)
+            prev_cjk = tok
+        else:
+            tok = tok.strip(".")
+            if not tok:
+                continue
+            words.append(tok)
+            prev_cjk = None
+    if words:
+        out |= _char_ngrams(" ".join(words))
+    # 单字标题兜底，避免空集合
+    if not out and tokens:
+        out.update(tokens)
+    return out
+
+
+def tickers(item, text: str) -> set:
+    """条目涉及的币种：优先用 CryptoPanic 的 currencies 字段，没有时从标题识别。
+
+    标题为句子式大小写时，首字母大写的词 (Ethereum / Solana / Coinbase) 也算作专有名词；
+    标题式大小写 (每个词都大写开头) 无法区分专有名词，只取全大写代码。
+    复数 s 统一去掉，"ETF" 与 "ETFs" 视为同一个。
+    """
+    cur = item.get("currencies")
+    if isinstance(cur, list):
+        codes = {str(c.get("code") if isinstance(c, dict) else c).upper() for c in cur}
+    elif cur:
+        codes = {c.strip().upper() for c in str(cur).split(",")}
+    else:
+        words = _WORD_RE.findall(text or "")
+        capital = [w for w in words if w[0].isupper()]
+        if len(capital) * 2 <= len(words):
+            codes = {w.upper() for w in capital}
+        else:
+            codes = set(_TICKER_RE.findall(text or ""))
+        codes = {c[:-1] if len(c) > 3 and c.endswith("S") else c for c in codes}
+    codes.discard("")
+    return codes
+
+
+class MinHashLSH:
+    """MinHash 签名 + LSH 分桶。
+
+    num_perm = bands * rows；相似度阈值约为 (1/bands) ** (1/rows)。
+    默认 16 x 4，约在 Jaccard 0.5 附近开始成为候选，再按 threshold (默认 0.6) 精确过滤。
+    """
+
+    def __init__(self, bands: int = 16, rows: int = 4):
+        self.bands = bands
+        self.rows = rows
+        self.num_perm = bands * rows
+        self._perms = _permutations(self.num_perm)
+
+    def signature(self, shingle_set: set) -> List[int]:
+        hashes = [zlib.crc32(s.encode("utf-8")) for s in shingle_set]
+        if not hashes:
+            return [_MAX_HASH] * self.num_perm
+        return [min(((a * h + b) % _PRIME) & _MAX_HASH for h in hashes) for a, b in self._perms]
+
+    @staticmethod
+    def similarity(sig_a: List[int], sig_b: List[int]) -> float:
+        """用签名相同位置的比例估算 Jaccard"""
+        same = sum(1 for x, y in zip(sig_a, sig_b) if x == y)
+        return same / len(sig_a) if sig_a else 0.0
+
+    def candidate_pairs(self, signatures: List[List[int]]):
+        """同一 band 落入同一桶的两条记录即为候选对"""
+        pairs = set()
+        for band in range(self.bands):
+            start = band * self.rows
+            buckets: Dict[tuple, List[int]] = {}
+            for idx, sig in enumerate(signatures):
+                buckets.setdefault(tuple(sig[start:start + self.rows]), []).append(idx)
+            for members in buckets.values():
+                if len(members) < 2:
+                    continue
+                head = members[0]
+                # 与桶内首条配对即可，剩余连通性由并查集传递
+                for other in members[1:]:
+                    pairs.add((head, other))
+        return pairs
+
+
+def cluster_near_duplicates(
+    items: List[Dict],
+    key: Union[str, Callable[[Dict], str]] = "title",
+    threshold: float = 0.6,
+    lsh: Optional[MinHashLSH] = None,
+) -> List[Dict]:
+    """把近似重复的条目聚成簇，每簇保留最靠前的一条作为代表。
+
+    LSH 只负责挑出候选对，是否合并按精确 Jaccard >= threshold 判断；
+    双方都能识别出币种且币种集合不同时不合并。
+
+    代表条目会带上 source_count 字段 (簇内条目数，已存在的 source_count 会累加)，
+    返回顺序与输入一致。
+    """
+    if not items:
+        return []
+    get_text = key if callable(key) else (lambda x: x.get(key) or "")
+    lsh = lsh or MinHashLSH()
+
+    texts = [get_text(x) for x in items]
+    sets = [shingles(t) for t in texts]
+    codes = [tickers(x, t) for x, t in zip(items, texts)]
+    sigs = [lsh.signature(s) for s in sets]
+
+    parent = list(range(len(items)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in lsh.candidate_pairs(sigs):
+        if not sets[i] or not sets[j]:
+            continue
+        if codes[i] and codes[j] and codes[i] != codes[j]:
+            continue
+        if len(sets[i] & sets[j]) / len(sets[i] | sets[j]) < threshold:
+            continue
+        ri, rj = find(i), find(j)
+        if ri != rj:
+            # 保留下标更小 (更靠前/更热) 的条目作为簇代表
+            parent[max(ri, rj)] = min(ri, rj)
+
+    counts: Dict[int, int] = {}
+    for idx, item in enumerate(items):
+        root = find(idx)
+        counts[root] = counts.get(root, 0) + int(item.get("source_count") or 1)
+
+    result = []
+    for idx, item in enumerate(items):
+        if find(idx) == idx:
+            if isinstance(item, Record):
+                rep = item.replace(source_count=counts[idx])
+            else:
+                rep = dict(item)
+                rep["source_count"] = counts[idx]
+            result.append(rep)
+    return result
@@ -0,0 +1,143 @@
+import base64
+import gzip
+import json
+import os
+from datetime import datetime
+
+# --- 紧凑版 HTML 报告 ---
+# 与 save_to_html 的完整 <tr>/<td> 展开不同，这里把各 tab 数据按列式 JSON
+# 压缩 (gzip + base64) 后只嵌入一次，由浏览器端解压并渲染：
+# 虚拟滚动 (只渲染可见行)、点击表头排序、关键字过滤。单文件、离线可用。
+# 解压依赖浏览器的 DecompressionStream (Chrome 80+ / Firefox 113+ / Safari 16.4+)。
+
+_ROW_HEIGHT = 40
+
+_CSS = """
+body{font-family:-apple-system,BlinkMacSystemFont,"Segoe UI",Roboto,Helvetica,Arial,sans-serif;background:#f4f6f8;margin:0;padding:20px;color:#333}
+.container{max-width:1000px;margin:0 auto;background:#fff;border-radius:12px;box-shadow:0 4px 12px rgba(0,0,0,.05);overflow:hidden}
+.header{background:#0366d6;color:#fff;padding:20px;text-align:center}.header h1{margin:0;font-size:24px}.header p{margin:5px 0 0;opacity:.8;font-size:14px}
+.tabs{display:flex;background:#f0f2f5;border-bottom:1px solid #ddd;overflow-x:auto}
+.tab-btn{padding:15px 20px;cursor:pointer;border:none;background:none;font-weight:600;color:#666;white-space:nowrap}
+.tab-btn:hover{background:#e6e8eb}.tab-btn.active{color:#0366d6;border-bottom:3px solid #0366d6;background:#fff}
+.bar{padding:12px 20px}.bar input{width:100%%;box-sizing:border-box;padding:8px 10px;border:1px solid #ddd;border-radius:6px}
+.viewport{height:70vh;overflow:auto;margin:0 20px 20px}
+table{width:100%%;border-collapse:collapse;font-size:14px;table-layout:fixed}
+th{text-align:left;padding:12px;background:#f9fafb;border-bottom:2px solid #eee;color:#555;position:sticky;top:0;cursor:pointer;user-select:none}
+td{padding:0 12px;height:%(row)dpx;border-bottom:1px solid #eee;white-space:nowrap;overflow:hidden;text-overflow:ellipsis}
+.tag{display:inline-block;padding:2px 8px;border-radius:12px;font-size:12px;font-weight:500}
+.tag-green{background:#e6fffa;color:#047857}.tag-red{background:#fef2f2;color:#b91c1c}.tag-blue{background:#eff6ff;color:#1d4ed8}
+a{color:#0366d6;text-decoration:none}.empty-tip{text-align:center;padding:40px;color:#999}
+""" % {"row": _ROW_HEIGHT}
+
+_JS = r"""
+(function(){
+var H=%(row)d,OVER=10,tabs=[],cur=0,view=[],sortCol=-1,sortDir=1;
+function esc(s){return String(s).replace(/[&<>"']/g,function(c){return {"&":"&amp;","<":"&lt;",">":"&gt;",'"':"&quot;","'":"&#39;"}[c];});}
+function fmt(k,v){
+  if(v===null||v===undefined)return "";
+  var s=String(v);
+  if(k==="market_cap"&&!isNaN(parseFloat(v)))return "$"+(parseFloat(v)/1e9).toLocaleString(undefined,{minimumFractionDigits:2,maximumFractionDigits:2})+"B";
+  if(s.indexOf("http")>=0)return "<a href=\""+esc(s)+"\" target=\"_blank\">Link</a>";
+  if(s.indexOf("%%")>=0&&s.indexOf("-")>=0)return "<span class=\"tag tag-red\">"+esc(s)+"</span>";
+  if(s.indexOf("%%")>=0)return "<span class=\"tag tag-green\">"+esc(s)+"</span>";
+  if(k==="amount"&&s.toLowerCase().indexOf("m")>=0)return "<span class=\"tag tag-blue\">"+esc(s)+"</span>";
+  return esc(s);
+}
+function title(k){return k.replace(/_/g," ").replace(/\b\w/g,function(c){return c.toUpperCase();});}
+function cmp(a,b){
+  var x=parseFloat(a),y=parseFloat(b);
+  if(!isNaN(x)&&!isNaN(y)&&String(x)===String(a).trim()&&String(y)===String(b).trim())return x-y;
+  return String(a===null?"":a).localeCompare(String(b===null?"":b));
+}
+function refilter(){
+  var t=tabs[cur],q=document.getElementById("q").value.trim().toLowerCase();
+  view=t.rows.filter(function(r){return !q||r.join("\u0001").toLowerCase().indexOf(q)>=0;});
+  if(sortCol>=0)view.sort(function(a,b){return sortDir*cmp(a[sortCol],b[sortCol]);});
+  document.getElementById("vp").scrollTop=0;paint();
+}
+function paint(){
+  var t=tabs[cur],vp=document.getElementById("vp"),body=document.getElementById("tb");
+  if(!t.rows.length){body.innerHTML="<tr><td class=\"empty-tip\" colspan=\""+Math.max(t.cols.length,1)+"\">暂无数据 (No Data Available)</td></tr>";return;}
+  var first=Math.max(0,Math.floor(vp.scrollTop/H)-OVER),last=Math.min(view.length,Math.ceil((vp.scrollTop+vp.clientHeight)/H)+OVER);
+  var html="<tr style=\"height:"+(first*H)+"px\"></tr>";
+  for(var i=first;i<last;i++){
+    var r=view[i];html+="<tr>";
+    for(var j=0;j<t.cols.length;j++)html+="<td>"+fmt(t.cols[j],r[j])+"</td>";
+    html+="</tr>";
+  }
+  html+="<tr style=\"height:"+((view.length-last)*H)+"px\"></tr>";
+  body.innerHTML=html;
+}
+function open(i){
+  cur=i;sortCol=-1;sortDir=1;
+  var btns=document.querySelectorAll(".tab-btn");
+  for(var b=0;b<btns.length;b++)btns[b].className="tab-btn"+(b===i?" active":"");
+  var t=tabs[i],h="";
+  for(var j=0;j<t.cols.length;j++)h+="<th data-c=\""+j+"\">"+esc(title(t.cols[j]))+"</th>";
+  document.getElementById("th").innerHTML="<tr>"+h+"</tr>";
+  document.getElementById("q").value="";refilter();
+}
+function start(data){
+  tabs=data;var bar="";
+  for(var i=0;i<tabs.length;i++)bar+="<button class=\"tab-btn\" data-i=\""+i+"\">"+esc(tabs[i].title)+" ("+tabs[i].rows.length+")</button>";
+  var el=document.getElementById("tabs");el.innerHTML=bar;
+  el.onclick=function(e){var i=e.target.getAttribute("data-i");if(i!==null)open(+i);};
+  document.getElementById("th").onclick=function(e){
+    var c=e.target.getAttribute("data-c");if(c===null)return;c=+c;
+    sortDir=(sortCol===c)?-sortDir:1;sortCol=c;refilter();
+  };
+  document.getElementById("q").oninput=refilter;
+  var ticking=false;
+  document.getElementById("vp").onscroll=function(){if(!ticking){ticking=true;requestAnimationFrame(function(){ticking=false;paint();});}};
+  if(tabs.length)open(0);
+}
+var b64=document.getElementById("report-data").textContent.trim();
+var bin=Uint8Array.from(atob(b64),function(c){return c.charCodeAt(0);});
+if(typeof DecompressionStream==="undefined"){document.getElementById("tb").innerHTML="<tr><td class=\"empty-tip\">当前浏览器不支持解压，请使用新版 Chrome / Firefox / Safari 打开。</td></tr>";return;}
+new Response(new Blob([bin]).stream().pipeThrough(new DecompressionStream("gzip"))).text().then(function(s){start(JSON.parse(s));});
+})();
+""" % {"row": _ROW_HEIGHT}
+
+
+def _jsonable(v):
+    if v is None or isinstance(v, (int, float, str, bool)):
+        return v
+    return str(v)
+
+
+def pack_tabs(data_map: dict) -> str:
+    """把 {tab 名: 记录列表} 打包成列式 JSON，gzip 后 base64 编码"""
+    tabs = []
+    for title, data in data_map.items():
+        clean_title = title.split('.', 1)[-1] if '.' in title else title
+        cols = list(data[0].keys()) if data else []
+        rows = [[_jsonable(item.get(c)) for c in cols] for item in data]
+        tabs.append({"title": clean_title, "cols": cols, "rows": rows})
+    raw = json.dumps(tabs, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.b64encode(gzip.compress(raw, compresslevel=9, mtime=0)).decode("ascii")
+
+
+def save_to_compact_html(data_map: dict, output_dir: str = "output") -> str:
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+    date_str = datetime.now().strftime("%Y-%m-%d")
+    # 与完整版区分文件名，两种格式可并存
+    file_name = f"Web3_Daily_Report_{date_str}.compact.html"
+    file_path = os.path.join(output_dir, file_name)
+
+    full_html = (
+        f'<!DOCTYPE html><html><head><meta charset="UTF-8"><title>Report</title><style>{_CSS}</style></head><body>'
+        f'<div class="container"><div class="header"><h1>🚀 Web3 Daily Insight</h1><p>{date_str}</p></div>'
+        f'<div class="tabs" id="tabs"></div><div class="bar"><input id="q" placeholder="筛选 (Filter)..."></div>'
+        f'<div class="viewport" id="vp"><table><thead id="th"></thead><tbody id="tb"></tbody></table></div></div>'
+        f'<script type="application/octet-stream" id="report-data">{pack_tabs(data_map)}</script>'
+        f'<script>{_JS}</script></body></html>'
+    )
+
+    try:
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(full_html)
+        return file_path
+    except Exception as e:
+        print(f"[ERROR] 紧凑版 HTML 生成失败: {e}")
+        return None
@@ -17,11 +17,13 @@ def save_to_excel(data_map: dict, output_dir: str = "output") -> str:
                 if not data_list:
                     pd.DataFrame({"Info": ["暂无数据"]}).to_excel(writer, sheet_name=sheet_name, index=False)
                 else:
-                    df = pd.DataFrame(data_list)
+                    # 兼容普通 dict 与 src.records 记录对象
+                    # dtype=object：保留整数价格与缺失值原样，避免被统一转成 float ("70123.0" / nan)
+                    df = pd.DataFrame([dict(x) for x in data_list], dtype=object)
                     # 特殊处理：如果是行情数据，格式化一下
                     if "price" in df.columns:
-                        df['price'] = df['price'].apply(lambda x: f"${x}")
-                        df['change_24h'] = df['change_24h'].apply(lambda x: f"{x:.2f}%")
+                        df['price'] = df['price'].apply(lambda x: "" if pd.isna(x) else f"${x}")
+                        df['change_24h'] = df['change_24h'].apply(lambda x: "" if pd.isna(x) else f"{x:.2f}%")
                     
                     df.to_excel(writer, sheet_name=sheet_name, index=False)
                     has_data = True
@@ -0,0 +1,223 @@
+import json
+import os
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+# --- 数据源熔断与健康度 ---
+# 每个 (数据源, 接口) 一个熔断器，状态持久化到 output/provider_health.json，跨运行生效：
+# - closed: 正常请求；连续失败达到阈值 -> open
+# - open: 直接跳过 (调用方立即走 main() 的兜底逻辑)，直到冷却结束
+# - half_open: 冷却结束后放行一次探测 (使用短超时)；成功 -> closed，失败 -> open 且冷却时间翻倍
+# 探测按数据源限流：同一数据源同时只有一个接口在探测，探测失败后该源其余接口本轮直接跳过，
+# 所以一个挂掉的数据源每次运行最多付出一次短超时。
+# 冷却时间按调用节奏设定：日报每天跑一次，默认冷却略短于一天，保证下一次运行一定会探测；
+# 高频提醒轮询 (src.alerts) 用 configure() 切换到独立的状态文件与分钟级冷却。
+# 同时记录最近若干次调用的成败与耗时，用于计算错误率与延迟分位数。
+# 状态只在 save()/publish() 时落盘 (每次运行一次)，publish 同时追加一行到
+# output/provider_health.jsonl，便于画图。
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+FAILURE_THRESHOLD = 3
+BASE_COOLDOWN = 20 * 3600     # 首次熔断冷却 20 小时 (略短于日跑间隔，次日运行必然探测)
+MAX_COOLDOWN = 3 * 24 * 3600  # 冷却上限 3 天
+PROBE_TIMEOUT = 5             # 探测请求的超时 (秒)，远短于各数据源的正常超时
+WINDOW = 50                   # 统计窗口 (最近 N 次调用)
+PROBE_LEASE = 300             # 探测租约：探测未结束时，5 分钟内不再重复探测
+
+DEFAULT_PATH = os.path.join("output", "provider_health.json")
+
+
+class CircuitOpen(Exception):
+    """熔断打开时调用被跳过"""
+
+
+class EndpointHealth:
+    __slots__ = ("state", "failures", "open_until", "cooldown", "window", "calls", "errors", "skipped", "last_error")
+
+    def __init__(self, state: str = CLOSED, failures: int = 0, open_until: float = 0, cooldown: float = BASE_COOLDOWN,
+                 window: List = None, calls: int = 0, errors: int = 0, skipped: int = 0, last_error: str = ""):
+        self.state = state
+        self.failures = failures
+        self.open_until = open_until
+        self.cooldown = cooldown
+        # [[是否成功, 耗时毫秒, 时间戳], ...]
+        self.window = window or []
+        self.calls = calls
+        self.errors = errors
+        self.skipped = skipped
+        self.last_error = last_error
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "EndpointHealth":
+        return cls(**{k: d[k] for k in cls.__slots__ if k in d})
+
+    def to_dict(self) -> Dict:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def _observe(self, ok: bool, latency_ms: float, now: float) -> None:
+        self.window.append([ok, round(latency_ms, 1), now])
+        if len(self.window) > WINDOW:
+            del self.window[:-WINDOW]
+        self.calls += 1
+
+    def stats(self) -> Dict:
+        lat = sorted(w[1] for w in self.window)
+
+        def pct(p):
+            if not lat:
+                return None
+            return lat[min(len(lat) - 1, int(round(p / 100 * (len(lat) - 1))))]
+
+        fails = sum(1 for w in self.window if not w[0])
+        return {
+            "state": self.state,
+            "error_rate": round(fails / len(self.window), 3) if self.window else None,
+            "p50_ms": pct(50),
+            "p95_ms": pct(95),
+            "calls": self.calls,
+            "errors": self.errors,
+            "skipped": self.skipped,
+            "open_until": self.open_until or None,
+            "last_error": self.last_error,
+        }
+
+
+class HealthRegistry:
+    def __init__(self, path: str = DEFAULT_PATH, base_cooldown: float = BASE_COOLDOWN,
+                 max_cooldown: float = MAX_COOLDOWN, probe_timeout: float = PROBE_TIMEOUT):
+        self.path = path
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.probe_timeout = probe_timeout
+        self.endpoints: Dict[str, EndpointHealth] = {}
+        # 数据源 -> 在此时间前不再放行该源的其它探测 (探测进行中或刚失败)
+        self._probe_gate: Dict[str, float] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    raw = json.load(f) or {}
+                self.endpoints = {k: EndpointHealth.from_dict(v) for k, v in raw.items()}
+            except Exception as e:
+                print(f"[WARN] 健康状态读取失败，已重置: {e}")
+
+    def get(self, source: str, endpoint: str) -> EndpointHealth:
+        return self.endpoints.setdefault(f"{source}/{endpoint}", EndpointHealth(cooldown=self.base_cooldown))
+
+    def allow(self, source: str, endpoint: str, now: float = None) -> bool:
+        """是否放行本次调用；open 状态下冷却结束时转为 half_open 并放行一次探测 (每个数据源同时只探测一个接口)"""
+        now = now if now is not None else time.time()
+        h = self.get(source, endpoint)
+        if h.state == CLOSED:
+            return True
+        if now >= h.open_until and now >= self._probe_gate.get(source, 0):
+            h.state = HALF_OPEN
+            h.open_until = now + PROBE_LEASE
+            self._probe_gate[source] = h.open_until
+            print(f"[INFO] {source}/{endpoint} 熔断冷却结束，发起探测")
+            return True
+        # open 未到期、本接口探测已在进行，或同源其它接口正在探测 / 刚探测失败
+        h.skipped += 1
+        return False
+
+    def record_success(self, source: str, endpoint: str, latency_ms: float, now: float = None) -> None:
+        now = now if now is not None else time.time()
+        h = self.get(source, endpoint)
+        h._observe(True, latency_ms, now)
+        if h.state != CLOSED:
+            print(f"[INFO] {source}/{endpoint} 已恢复，熔断关闭")
+            # 数据源已恢复，同源其它接口可以继续探测
+            self._probe_gate.pop(source, None)
+        h.state = CLOSED
+        h.failures = 0
+        h.cooldown = self.base_cooldown
+        h.open_until = 0
+
+    def record_failure(self, source: str, endpoint: str, latency_ms: float, error: str = "", now: float = None) -> None:
+        now = now if now is not None else time.time()
+        h = self.get(source, endpoint)
+        h._observe(False, latency_ms, now)
+        h.errors += 1
+        h.failures += 1
+        h.last_error = str(error)[:200]
+        if h.state == HALF_OPEN:
+            # 探测失败，冷却翻倍；该源其余已熔断的接口一并顺延，下次仍只探测一个
+            h.cooldown = min(h.cooldown * 2, self.max_cooldown)
+            self._open(source, endpoint, h, now)
+            self._probe_gate[source] = h.open_until
+            for key, other in self.endpoints.items():
+                if key.startswith(source + "/") and other is not h and other.state != CLOSED:
+                    other.state = OPEN
+                    other.open_until = max(other.open_until, h.open_until)
+        elif h.failures >= FAILURE_THRESHOLD:
+            h.cooldown = self.base_cooldown
+            self._open(source, endpoint, h, now)
+
+    @staticmethod
+    def _open(source: str, endpoint: str, h: EndpointHealth, now: float) -> None:
+        h.state = OPEN
+        h.open_until = now + h.cooldown
+        until = datetime.fromtimestamp(h.open_until).strftime("%Y-%m-%d %H:%M")
+        print(f"[WARN] {source}/{endpoint} 连续失败 {h.failures} 次，熔断至 {until}")
+
+    def call(self, source: str, endpoint: str, fn: Callable, *args, timeout: float = None, **kwargs):
+        """受熔断保护地执行 fn：熔断打开时抛 CircuitOpen，失败时记录后原样抛出。
+        传入 timeout 时原样转给 fn；探测期间改用更短的 probe_timeout。"""
+        if not self.allow(source, endpoint):
+            raise CircuitOpen(f"{source}/{endpoint} 熔断中，跳过")
+        if timeout is not None:
+            probing = self.get(source, endpoint).state == HALF_OPEN
+            kwargs["timeout"] = min(timeout, self.probe_timeout) if probing else timeout
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self.record_failure(source, endpoint, (time.perf_counter() - start) * 1000, e)
+            raise
+        self.record_success(source, endpoint, (time.perf_counter() - start) * 1000)
+        return result
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({k: v.to_dict() for k, v in self.endpoints.items()}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def summary(self) -> Dict[str, Dict]:
+        return {k: v.stats() for k, v in sorted(self.endpoints.items())}
+
+    def publish(self) -> Dict[str, Dict]:
+        """打印健康概览，并向 provider_health.jsonl 追加一行时间序列"""
+        self.save()
+        summary = self.summary()
+        series = os.path.splitext(self.path)[0] + ".jsonl"
+        with open(series, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"ts": datetime.now().isoformat(timespec="seconds"), "endpoints": summary},
+                               ensure_ascii=False) + "\n")
+        for key, s in summary.items():
+            rate = "-" if s["error_rate"] is None else f"{s['error_rate'] * 100:.0f}%"
+            p95 = "-" if s["p95_ms"] is None else f"{s['p95_ms']:.0f}ms"
+            print(f"    - {key}: {s['state']} | 错误率 {rate} | p95 {p95} | 跳过 {s['skipped']}")
+        return summary
+
+
+_REGISTRY: Optional[HealthRegistry] = None
+
+
+def configure(path: str, **policy) -> HealthRegistry:
+    """替换进程内共享的健康状态 (独立的状态文件与冷却策略)，需在首次调用数据源前执行"""
+    global _REGISTRY
+    _REGISTRY = HealthRegistry(path, **policy)
+    return _REGISTRY
+
+
+def registry() -> HealthRegistry:
+    """进程内共享的健康状态 (路径可通过 PROVIDER_HEALTH_PATH 覆盖)"""
+    global _REGISTRY
+    if _REGISTRY is None:
+        _REGISTRY = HealthRegistry(os.getenv("PROVIDER_HEALTH_PATH", DEFAULT_PATH))
+    return _REGISTRY
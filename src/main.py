@@ -1,12 +1,21 @@
 import os
 import sys
 import re
+import argparse
 from datetime import datetime
 from src.providers.rootdata import RootDataClient
 from src.providers.coingecko import CoinGeckoClient
 from src.providers.cryptopanic import CryptoPanicClient
-from src.senders.email_sender import send_email
+from src.senders.email_sender import send_email, send_emails
 from src.summarize import generate_market_analysis
+from src.signals import load_history, load_rules, update_history
+from src.dedup import cluster_near_duplicates
+from src.export_compact import save_to_compact_html
+from src.checkpoint import RunCheckpoint
+from src.config import load_settings
+from src.health import registry as health_registry
+from src.records import AirdropItem, FundingRound, UnlockEvent, hydrate
+from src.tenants import check_channels, load_subscribers, render_all
 
 # --- 🛠️ HTML 生成工具 (无需修改) ---
 def save_to_html(data_map: dict, output_dir: str = "output") -> str:
@@ -79,7 +88,7 @@ def save_to_html(data_map: dict, output_dir: str = "output") -> str:
             for item in data:
                 contents_html += '<tr>'
                 for k, v in item.items():
-                    val = str(v)
+                    val = "" if v is None else str(v)
                     if k == "market_cap":
                         try: val = f"${float(v)/1000000000:,.2f}B"
                         except: val = str(v)
@@ -106,31 +115,36 @@ def save_to_html(data_map: dict, output_dir: str = "output") -> str:
         return file_path
     except: return None
 
+# 报告格式：full 为完整展开的表格，compact 为嵌入压缩 JSON + 客户端虚拟滚动
+REPORT_WRITERS = {
+    "full": save_to_html,
+    "compact": save_to_compact_html,
+}
+
 # --- 🧠 核心升级：智能数据提取器 ---
-def extract_data_from_news(news_list, keywords):
-    """从新闻标题中'清洗'出结构化数据"""
+def extract_data_from_news(news_list, keywords, record_cls=FundingRound):
+    """从新闻标题中'清洗'出结构化数据 (record_cls 为目标板块的记录类型)"""
     extracted = []
-    seen_titles = set()
     
+    # news_list 已在 fetch_all 中完成近似去重
     for n in news_list:
-        title = n.get('title', '')
-        if title in seen_titles: continue # 去重
+        title = n.title
         
         # 检查是否包含任一关键词 (不区分大小写)
         if any(k.lower() in title.lower() for k in keywords):
-            extracted.append({
-                "project_name": n.get('currencies') or "News Topic",
-                "info": title[:60] + "..." if len(title)>60 else title, # 截断过长标题
-                "url": n.get('url'),
-                "date": "Recent News"
-            })
-            seen_titles.add(title)
+            extracted.append(record_cls(
+                project_name=n.currencies or "News Topic",
+                info=title[:60] + "..." if len(title)>60 else title, # 截断过长标题
+                url=n.url,
+                date="Recent News",
+                source_count=n.source_count,
+                kind="news",
+            ))
             
     return extracted[:10] # 最多只取前10条，防止刷屏
 
-def main():
-    print(">>> [1/4] 启动全网数据抓取...")
-    
+def fetch_all() -> dict:
+    """抓取各数据源 (耗时/耗配额的阶段，结果会被断点缓存)"""
     # 1. 基础数据源 (最稳)
     cg = CoinGeckoClient()
     markets = cg.fetch_market_data(limit=100)
@@ -139,13 +153,29 @@ def main():
     cp_key = os.getenv("CRYPTOPANIC_API_KEY", "")
     cp = CryptoPanicClient(api_key=cp_key)
     news = cp.fetch_hot_news(limit=200) # 抓 200 条新闻作为数据池
+    # 翻译后再聚一次，合并不同语种来源翻成相近中文的同一事件
+    news = cluster_near_duplicates(news)
     
     # 2. 尝试抓取 RootData (可能会失败/为空)
     rd = RootDataClient()
-    fund = rd.fetch_fundraising()
-    air = rd.fetch_airdrops()
-    unl = rd.fetch_token_unlocks()
-    
+    raw = {
+        "markets": markets,
+        "trending": trending,
+        "news": news,
+        "fund": rd.fetch_fundraising(),
+        "air": rd.fetch_airdrops(),
+        "unl": rd.fetch_token_unlocks(),
+    }
+
+    print("    数据源健康度:")
+    health_registry().publish()
+    return raw
+
+def apply_fallbacks(raw: dict) -> dict:
+    """三重兜底策略：RootData 为空时从新闻/热搜/跌幅榜补数据"""
+    markets, trending, news = raw["markets"], raw["trending"], raw["news"]
+    fund, air, unl = raw["fund"], raw["air"], raw["unl"]
+
     # --- 🛡️ 三重兜底策略 (核心修复) ---
     
     # 策略 A: 融资板块兜底
@@ -156,43 +186,29 @@ def main():
     
     if not fund and trending:
         print("⚠️ [自动修复] 新闻提取失败，使用热搜币种填充...")
-        fund = [{"project_name": t['name'], "amount": f"Hot Rank #{t['rank']}", "investors": "Community", "date": "Today"} for t in trending[:5]]
+        fund = [FundingRound(project_name=t.name, amount=f"Hot Rank #{t.rank}", investors="Community", date="Today", kind="trending", rank=t.rank) for t in trending[:5]]
 
     # 策略 B: 空投板块兜底
     if not air:
         print("⚠️ [自动修复] RootData 空投数据为空，正在从新闻提取...")
-        air = extract_data_from_news(news, ["airdrop", "snapshot", "claim", "testnet", "points", "incentive", "空投", "快照", "积分", "测试网", "奖励", "领取"])
+        air = extract_data_from_news(news, ["airdrop", "snapshot", "claim", "testnet", "points", "incentive", "空投", "快照", "积分", "测试网", "奖励", "领取"], AirdropItem)
 
     # 策略 C: 解锁板块兜底 (用户最关心的)
     if not unl:
         print("⚠️ [自动修复] RootData 解锁数据为空，正在从新闻提取...")
-        unl = extract_data_from_news(news, ["unlock", "release", "cliff", "vesting", "circulation", "supply", "解锁", "释放", "流通"])
+        unl = extract_data_from_news(news, ["unlock", "release", "cliff", "vesting", "circulation", "supply", "解锁", "释放", "流通"], UnlockEvent)
     
     if not unl and markets:
         print("⚠️ [自动修复] 新闻提取失败，使用跌幅榜作为风险预警...")
         # 逻辑：大额解锁往往导致价格下跌，所以展示今日跌幅最大的币种作为“风险提示”
-        top_losers = sorted(markets, key=lambda x: x.get('change_24h', 0))[:5]
-        unl = [{"project_name": m['symbol'], "token": "Risk/Dip", "amount": f"{m['change_24h']:.2f}%", "unlock_date": "24h Drop"} for m in top_losers]
+        top_losers = sorted((m for m in markets if m.change_24h is not None), key=lambda x: x.change_24h)[:5]
+        unl = [UnlockEvent(project_name=m.symbol, token="Risk/Dip", amount=f"{m.change_24h:.2f}%", unlock_date="24h Drop", kind="dip", change_pct=m.change_24h) for m in top_losers]
 
     # ---------------------------------
+    return {"markets": markets, "trending": trending, "news": news, "fund": fund, "air": air, "unl": unl}
 
-    print(f"    - 融资:{len(fund)} | 行情:{len(markets)} | 新闻:{len(news)} | 解锁/风险:{len(unl)}")
-
-    print(">>> [2/4] 生成分析简报...")
-    summary_html = generate_market_analysis(fund, air, unl, trending, markets, news)
-
-    print(">>> [3/4] 生成 HTML 报告附件...")
-    report_path = save_to_html({
-        "0.市场行情": markets,
-        "1.舆情热点": news,
-        "2.融资/热门": fund,
-        "3.潜在空投": air,
-        "4.解锁/风险": unl,
-        "5.今日热搜": trending
-    })
-
-    print(">>> [4/4] 发送邮件...")
-    email_body = f"""
+def build_email_body(summary_html: str) -> str:
+    return f"""
     <h2>Web3 每日投研简报</h2>
     <div style="background-color: #f9f9f9; padding: 15px; border-left: 4px solid #0366d6;">
         {summary_html}
@@ -201,18 +217,148 @@ def main():
     <hr>
     <small>Generated by GitHub Actions</small>
     """
-    
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Web3 日报生成")
+    parser.add_argument("--resume", nargs="?", const="latest", default=None,
+                        help="从断点续跑：不带参数续跑最近一次，或指定 run id")
+    parser.add_argument("--output-dir", default="output")
+    parser.add_argument("--tenants", action="store_true",
+                        help="多订阅者模式：抓取一次，按 config.yaml 中的 subscribers 分别生成并批量发送")
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--report-format", choices=sorted(REPORT_WRITERS), default="full",
+                        help="HTML 报告格式：full (完整表格) 或 compact (压缩数据 + 虚拟滚动)")
+    parser.add_argument("--gzip-attachment", action="store_true", help="以 .gz 压缩报告附件")
+    args = parser.parse_args(argv)
+
     try:
+        ckpt = RunCheckpoint.open(args.output_dir, args.resume)
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print(f">>> Run ID: {ckpt.run_id}")
+
+    print(">>> [1/4] 启动全网数据抓取...")
+    # 断点读回的是 JSON，需还原为记录对象
+    raw = hydrate(ckpt.stage("fetch", fetch_all))
+    data = hydrate(ckpt.stage("normalize", lambda: apply_fallbacks(raw)))
+    markets, trending, news = data["markets"], data["trending"], data["news"]
+    fund, air, unl = data["fund"], data["air"], data["unl"]
+
+    print(f"    - 融资:{len(fund)} | 行情:{len(markets)} | 新闻:{len(news)} | 解锁/风险:{len(unl)}")
+
+    cfg = load_settings(args.config)
+    rules = load_rules(cfg)
+    history_path = os.path.join(args.output_dir, "signal_history.json")
+    history = load_history(history_path)
+
+    if args.tenants:
+        run_tenants(ckpt, data, cfg, args, history)
+        return
+
+    print(">>> [2/4] 生成分析简报...")
+    def summarize():
+        html = generate_market_analysis(fund, air, unl, trending, markets, news, rules=rules, history=history)
+        # 简报生成后才更新行情历史，续跑复用简报时不会重复累计
+        update_history(history_path, history, markets)
+        return html
+
+    summary_html = ckpt.stage("summary", summarize)
+
+    print(">>> [3/4] 生成 HTML 报告附件...")
+    write_report = REPORT_WRITERS[args.report_format]
+    # 报告写在本次 run 目录内并记录摘要与格式，避免同日其它运行覆盖或换格式续跑时被误用
+    def report_stage():
+        entry = ckpt.file_entry(write_report({
+            "0.市场行情": markets,
+            "1.舆情热点": news,
+            "2.融资/热门": fund,
+            "3.潜在空投": air,
+            "4.解锁/风险": unl,
+            "5.今日热搜": trending
+        }, ckpt.run_dir))
+        return dict(entry, format=args.report_format) if entry else None
+
+    report = ckpt.stage("report", report_stage,
+                        validator=lambda e: ckpt.file_valid(e) and e.get("format") == args.report_format)
+    report_path = report["path"] if report else None
+
+    print(">>> [4/4] 发送邮件...")
+    email_body = build_email_body(summary_html)
+
+    def deliver():
         send_email(
             subject=f"🚀 Web3 日报: {len(news)}条热点 | {len(fund)}个重点项目",
             body=email_body,
             env=os.environ,
-            attachments=[report_path] if report_path else []
+            attachments=[report_path] if report_path else [],
+            gzip_attachments=args.gzip_attachment,
         )
+        return {"sent_at": datetime.now().isoformat(timespec="seconds")}
+
+    try:
+        ckpt.stage("deliver", deliver)
         print("✅ 任务成功完成！")
     except Exception as e:
         print(f"❌ 邮件发送失败: {e}")
+        print(f"    重试: python -m src.main --resume {ckpt.run_id}")
+        sys.exit(1)
+
+def run_tenants(ckpt: RunCheckpoint, data: dict, cfg: dict, args: argparse.Namespace, history: dict = None) -> None:
+    """多订阅者：共享数据并行渲染，批量投递 (已发送的收件人在续跑时跳过)"""
+    subscribers = load_subscribers(cfg)
+    if not subscribers:
+        print("❌ 配置中没有 subscribers")
+        sys.exit(1)
+    problems = check_channels(subscribers)
+    if problems:
+        print("❌ 以下订阅者无法投递，请修正配置:")
+        for p in problems:
+            print(f"    - {p}")
+        sys.exit(1)
+
+    print(f">>> [2/4] 为 {len(subscribers)} 个订阅者并行生成简报与报告...")
+    def render():
+        ms = render_all(data, subscribers, ckpt.run_dir, rule_specs=cfg.get("signal_rules"), history=history,
+                        report_format=args.report_format)
+        # 与单报告模式一致：渲染完成后才更新行情历史，续跑复用时不会重复累计
+        update_history(os.path.join(args.output_dir, "signal_history.json"), history or {}, data["markets"])
+        for m in ms:
+            m["attachment_files"] = [ckpt.file_entry(p) for p in m["attachments"]]
+            m["report_format"] = args.report_format
+        return ms
+
+    messages = ckpt.stage(
+        "tenants_render",
+        render,
+        validator=lambda ms: all(m.get("report_format") == args.report_format and
+                                 all(ckpt.file_valid(e) for e in m.get("attachment_files", [None])) for m in ms),
+    )
+
+    print(">>> [4/4] 批量发送邮件...")
+    sent = ckpt.load("tenants_sent") if ckpt.resume and ckpt.is_valid("tenants_sent") else []
+    # 按订阅者名字记录进度：共用同一收件箱的多个订阅者各自计数
+    pending = [m for m in messages if m["name"] not in sent]
+
+    def mark_sent(m):
+        # 每发出一封立即落盘，中途断开时续跑不会重复发送
+        sent.append(m["name"])
+        ckpt.save("tenants_sent", sent)
+
+    try:
+        failed = send_emails(pending, env=os.environ, gzip_attachments=args.gzip_attachment,
+                             on_sent=mark_sent) if pending else []
+    except Exception as e:
+        print(f"❌ 邮件发送失败 (已发送 {len(sent)} 封): {e}")
+        print(f"    重试: python -m src.main --tenants --resume {ckpt.run_id}")
+        sys.exit(1)
+
+    if failed:
+        for to, err in failed:
+            print(f"❌ {to}: {err}")
+        print(f"    重试: python -m src.main --tenants --resume {ckpt.run_id}")
         sys.exit(1)
+    print(f"✅ 已发送 {len(sent)} 封订阅邮件！")
 
 if __name__ == "__main__":
     main()
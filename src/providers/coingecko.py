@@ -1,12 +1,14 @@
 import requests
 from typing import List, Dict
+from src.records import MarketQuote, TrendingCoin
+from src.health import registry
 
 class CoinGeckoClient:
     def __init__(self):
         self.base_url = "https://api.coingecko.com/api/v3"
 
-    def fetch_market_data(self, limit: int = 100) -> List[Dict]:
-        """获取市值排名"""
+    def fetch_market_data(self, limit: int = 100, price_change: str = "24h") -> List[MarketQuote]:
+        """获取市值排名 (price_change 可传 "1h,24h" 以同时获取 1 小时涨跌幅)"""
         url = f"{self.base_url}/coins/markets"
         params = {
             "vs_currency": "usd",
@@ -14,22 +16,20 @@ class CoinGeckoClient:
             "per_page": limit,
             "page": 1,
             "sparkline": "false",
-            "price_change_percentage": "24h"
+            "price_change_percentage": price_change
         }
         try:
-            r = requests.get(url, params=params, timeout=15)
-            r.raise_for_status()
+            r = registry().call("coingecko", "markets", self._get, url, params, timeout=15)
             return [self._normalize_market(x) for x in r.json()]
         except Exception as e:
             print(f"[WARN] CoinGecko 价格失败: {e}")
             return []
 
-    def fetch_trending(self) -> List[Dict]:
+    def fetch_trending(self) -> List[TrendingCoin]:
         """获取热搜币种 (已增加到前 20 名)"""
         url = f"{self.base_url}/search/trending"
         try:
-            r = requests.get(url, timeout=15)
-            r.raise_for_status()
+            r = registry().call("coingecko", "trending", self._get, url, timeout=15)
             data = r.json().get("coins", [])
             # [修改] 这里改成了 [:20]
             return [self._normalize_trending(x['item']) for x in data[:20]] 
@@ -38,19 +38,29 @@ class CoinGeckoClient:
             return []
 
     @staticmethod
-    def _normalize_market(item: Dict) -> Dict:
-        return {
-            "symbol": item.get("symbol", "").upper(),
-            "price": item.get("current_price", 0),
-            "change_24h": item.get("price_change_percentage_24h", 0),
-            "market_cap": item.get("market_cap", 0),
-        }
+    def _get(url: str, params: Dict = None, timeout: float = 15) -> requests.Response:
+        r = requests.get(url, params=params, timeout=timeout)
+        r.raise_for_status()
+        return r
 
     @staticmethod
-    def _normalize_trending(item: Dict) -> Dict:
-        return {
-            "name": item.get("name"),
-            "symbol": item.get("symbol"),
-            "rank": item.get("market_cap_rank"),
-            "score": item.get("score") + 1
-        }
+    def _normalize_market(item: Dict) -> MarketQuote:
+        return MarketQuote(
+            symbol=item.get("symbol", ""),
+            price=item.get("current_price"),
+            change_24h=item.get("price_change_percentage_24h"),
+            market_cap=item.get("market_cap", 0),
+            rank=item.get("market_cap_rank"),
+            volume=item.get("total_volume", 0),
+            circulating_supply=item.get("circulating_supply", 0),
+            change_1h=item.get("price_change_percentage_1h_in_currency"),
+        )
+
+    @staticmethod
+    def _normalize_trending(item: Dict) -> TrendingCoin:
+        return TrendingCoin(
+            name=item.get("name"),
+            symbol=item.get("symbol"),
+            rank=item.get("market_cap_rank"),
+            score=(item.get("score") or 0) + 1,
+        )
@@ -2,6 +2,9 @@ import requests
 import time
 from typing import List, Dict
 from deep_translator import GoogleTranslator
+from src.dedup import cluster_near_duplicates
+from src.records import NewsItem
+from src.health import CircuitOpen, registry
 
 class CryptoPanicClient:
     def __init__(self, api_key: str):
@@ -9,7 +12,7 @@ class CryptoPanicClient:
         self.base_url = "https://cryptopanic.com/api/v1"
         self.translator = GoogleTranslator(source='auto', target='zh-CN')
 
-    def fetch_hot_news(self, limit: int = 20) -> List[Dict]:
+    def fetch_hot_news(self, limit: int = 20) -> List[NewsItem]:
         """抓取并翻译当前最热的新闻 (带手动重试机制)"""
         if not self.api_key:
             print("[WARN] CryptoPanic API Key 未配置")
@@ -27,19 +30,23 @@ class CryptoPanicClient:
         max_retries = 3
         for attempt in range(max_retries):
             try:
-                # 设置 30秒 超时
-                r = requests.get(url, params=params, timeout=30)
-                r.raise_for_status()
+                # 设置 30秒 超时；熔断打开时立即跳过
+                r = registry().call("cryptopanic", "posts", self._request, url, params, timeout=30)
                 
                 # 如果成功，直接处理数据并返回
                 data = r.json()
                 results = data.get("results", [])
                 
+                # 先按原始标题做近似去重，只翻译每簇的代表条目
+                clustered = cluster_near_duplicates(results[:limit])
                 processed = []
-                for item in results[:limit]:
+                for item in clustered:
                     processed.append(self._normalize(item))
                 return processed
 
+            except CircuitOpen as e:
+                print(f"[WARN] {e}")
+                return []
             except Exception as e:
                 print(f"[WARN] 第 {attempt + 1} 次尝试抓取失败: {e}")
                 if attempt < max_retries - 1:
@@ -50,20 +57,28 @@ class CryptoPanicClient:
         # ------------------------------------
         return []
 
-    def _normalize(self, item: Dict) -> Dict:
+    @staticmethod
+    def _request(url: str, params: Dict, timeout: float = 30) -> requests.Response:
+        r = requests.get(url, params=params, timeout=timeout)
+        r.raise_for_status()
+        return r
+
+    def _normalize(self, item: Dict) -> NewsItem:
         domain = item.get("domain", "unknown")
         source_title = item.get("source", {}).get("title", domain)
         raw_title = item.get("title", "")
         
         try:
-            title_zh = self.translator.translate(raw_title)
+            # 翻译服务不可用时熔断，剩余标题直接保留原文
+            title_zh = registry().call("google_translate", "translate", self.translator.translate, raw_title)
         except Exception:
             title_zh = raw_title
         
-        return {
-            "title": title_zh,
-            "published_at": item.get("published_at", ""),
-            "source": source_title,
-            "url": item.get("url", ""),
-            "currencies": ", ".join([c.get("code") for c in item.get("currencies") or []])
-        }
\ No newline at end of file
+        return NewsItem(
+            title=title_zh,
+            published_at=item.get("published_at", ""),
+            source=source_title,
+            url=item.get("url", ""),
+            currencies=", ".join([c.get("code") for c in item.get("currencies") or []]),
+            source_count=item.get("source_count", 1),
+        )
\ No newline at end of file
@@ -1,5 +1,7 @@
 import requests
 from typing import Dict, List, Union
+from src.records import AirdropItem, FundingRound, UnlockEvent
+from src.health import registry
 
 class RootDataClient:
     def __init__(self, base_url: str = "https://api.rootdata.com/open", api_key: str = ""):
@@ -16,14 +18,18 @@ class RootDataClient:
     def _get(self, path: str, params: Dict = None) -> Union[Dict, List]:
         url = f"{self.base_url}/{path.lstrip('/')}"
         try:
-            r = requests.get(url, headers=self.headers, params=params or {}, timeout=10)
-            r.raise_for_status()
-            return r.json()
+            # 熔断打开时立即抛 CircuitOpen，不再等待超时
+            return registry().call("rootdata", path.strip("/"), self._request, url, params, timeout=10)
         except Exception as e:
             # 这里不打印错误，静默失败，交给 main.py 的备用方案处理
             return {}
 
-    def _fetch_list(self, endpoint: str, normalizer_func) -> List[Dict]:
+    def _request(self, url: str, params: Dict = None, timeout: float = 10) -> Union[Dict, List]:
+        r = requests.get(url, headers=self.headers, params=params or {}, timeout=timeout)
+        r.raise_for_status()
+        return r.json()
+
+    def _fetch_list(self, endpoint: str, normalizer_func) -> List:
         data = self._get(endpoint)
         items = []
         if isinstance(data, list):
@@ -36,36 +42,36 @@ class RootDataClient:
             
         return [normalizer_func(x) for x in items if isinstance(x, dict)]
 
-    def fetch_fundraising(self) -> List[Dict]:
+    def fetch_fundraising(self) -> List[FundingRound]:
         return self._fetch_list("fundraising_projects", self._normalize_fundraising)
 
-    def fetch_token_unlocks(self) -> List[Dict]:
+    def fetch_token_unlocks(self) -> List[UnlockEvent]:
         return self._fetch_list("token_unlocks", self._normalize_token_unlocks)
 
-    def fetch_airdrops(self) -> List[Dict]:
+    def fetch_airdrops(self) -> List[AirdropItem]:
         return self._fetch_list("airdrops", self._normalize_airdrop)
 
     @staticmethod
-    def _normalize_fundraising(x: Dict) -> Dict:
-        return {
-            "project_name": x.get("project_name") or x.get("name") or "Unknown",
-            "amount": x.get("amount") or x.get("money") or "N/A",
-            "investors": x.get("investors") or "",
-            "date": x.get("date") or "",
-        }
+    def _normalize_fundraising(x: Dict) -> FundingRound:
+        return FundingRound(
+            project_name=x.get("project_name") or x.get("name") or "Unknown",
+            amount=x.get("amount") or x.get("money") or "N/A",
+            investors=x.get("investors") or "",
+            date=x.get("date") or "",
+        )
 
     @staticmethod
-    def _normalize_token_unlocks(x: Dict) -> Dict:
-        return {
-            "project_name": x.get("project_name") or "Unknown",
-            "token": x.get("token") or x.get("symbol") or "",
-            "amount": x.get("amount") or "0",
-            "unlock_date": x.get("unlock_date") or "",
-        }
+    def _normalize_token_unlocks(x: Dict) -> UnlockEvent:
+        return UnlockEvent(
+            project_name=x.get("project_name") or "Unknown",
+            token=x.get("token") or x.get("symbol") or "",
+            amount=x.get("amount") or "0",
+            unlock_date=x.get("unlock_date") or "",
+        )
 
     @staticmethod
-    def _normalize_airdrop(x: Dict) -> Dict:
-        return {
-            "project_name": x.get("project_name") or "Unknown",
-            "status": x.get("status") or "Active",
-        }
+    def _normalize_airdrop(x: Dict) -> AirdropItem:
+        return AirdropItem(
+            project_name=x.get("project_name") or "Unknown",
+            status=x.get("status") or "Active",
+        )
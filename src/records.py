@@ -0,0 +1,207 @@
+from collections.abc import Mapping
+from typing import Dict, Optional
+
+# --- 规范化记录类型 ---
+# 各数据源统一输出 __slots__ 记录，数值字段在构造时解析一次，
+# 下游直接读属性，不再反复 .get / 字符串探测。
+# 记录同时实现只读 Mapping 接口 (只暴露 FIELDS 中非 None 的展示字段)，
+# 所以 HTML 表格、pandas 等按 dict 消费的代码可以原样使用。
+
+
+def parse_amount(amount_str) -> float:
+    """提取金额数字"""
+    try:
+        clean = str(amount_str).replace("$", "").replace(",", "").lower()
+        if "m" in clean: return float(clean.replace("m", "")) * 1000000
+        if "k" in clean: return float(clean.replace("k", "")) * 1000
+        return float(clean)
+    except:
+        return 0
+
+
+def _float(v) -> float:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _number(v):
+    """数值字段：整数保持 int (与数据源原样一致，避免展示成 "70123.0")，其余转 float"""
+    if isinstance(v, int) and not isinstance(v, bool):
+        return v
+    return _float(v)
+
+
+def _int(v) -> Optional[int]:
+    try:
+        return int(v)
+    except (TypeError, ValueError):
+        return None
+
+
+class Record(Mapping):
+    __slots__ = ()
+    # 展示字段 (表格列顺序)，其余 slots 为解析后的内部字段
+    FIELDS = ()
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            v = getattr(self, key)
+            if v is not None:
+                return v
+        raise KeyError(key)
+
+    def __iter__(self):
+        return (f for f in self.FIELDS if getattr(self, f) is not None)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict:
+        """完整序列化 (含内部字段)，用于断点落盘"""
+        return {f: getattr(self, f) for f in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "Record":
+        if isinstance(d, cls):
+            return d
+        return cls(**{k: d[k] for k in cls.__slots__ if k in d})
+
+    def replace(self, **changes) -> "Record":
+        d = self.to_dict()
+        d.update(changes)
+        return type(self)(**d)
+
+
+class MarketQuote(Record):
+    __slots__ = ("symbol", "price", "change_24h", "market_cap", "rank", "volume", "circulating_supply", "change_1h")
+    FIELDS = ("symbol", "price", "change_24h", "market_cap")
+
+    def __init__(self, symbol: str = "", price=None, change_24h=None, market_cap=0, rank=None, volume=0,
+                 circulating_supply=0, change_1h=None):
+        self.symbol = (symbol or "").upper()
+        # 数据源返回 null 时保留 None (未知)，不能当成 0，否则价格提醒会误触发
+        self.price = _number(price) if price is not None else None
+        self.change_24h = _float(change_24h) if change_24h is not None else None
+        self.market_cap = _number(market_cap)
+        self.rank = _int(rank)
+        self.volume = _number(volume)
+        self.circulating_supply = _float(circulating_supply)
+        self.change_1h = _float(change_1h) if change_1h is not None else None
+
+    # 行情表列固定：缺失的价格/涨跌幅也占一列 (值为 None)，避免表格错位
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+
+class TrendingCoin(Record):
+    __slots__ = ("name", "symbol", "rank", "score")
+    FIELDS = __slots__
+
+    def __init__(self, name: str = "", symbol: str = "", rank=None, score=0):
+        self.name = name or ""
+        self.symbol = symbol or ""
+        self.rank = _int(rank)
+        self.score = _int(score) or 0
+
+
+class NewsItem(Record):
+    __slots__ = ("title", "published_at", "source", "url", "currencies", "source_count")
+    FIELDS = __slots__
+
+    def __init__(self, title: str = "", published_at: str = "", source: str = "", url: str = "",
+                 currencies: str = "", source_count=1):
+        self.title = title or ""
+        self.published_at = published_at or ""
+        self.source = source or ""
+        self.url = url or ""
+        self.currencies = currencies or ""
+        self.source_count = _int(source_count) or 1
+
+
+# 以下三类记录既可能来自 RootData，也可能来自 main() 的兜底逻辑，
+# 用 kind 区分来源："rootdata" | "news" (新闻提取) | "trending" (热搜填充) | "dip" (跌幅榜)
+
+class FundingRound(Record):
+    __slots__ = ("project_name", "amount", "investors", "date", "info", "url", "source_count",
+                 "kind", "amount_usd", "rank")
+    FIELDS = ("project_name", "amount", "investors", "date", "info", "url", "source_count")
+
+    def __init__(self, project_name: str = "Unknown", amount=None, investors=None, date=None,
+                 info=None, url=None, source_count=None, kind: str = "rootdata", amount_usd=None, rank=None):
+        self.project_name = project_name or "Unknown"
+        self.amount = amount
+        self.investors = investors
+        self.date = date
+        self.info = info
+        self.url = url
+        self.source_count = source_count
+        self.kind = kind
+        self.amount_usd = _float(amount_usd) if amount_usd is not None else (
+            parse_amount(amount) if kind == "rootdata" else 0.0)
+        self.rank = _int(rank)
+
+
+class UnlockEvent(Record):
+    __slots__ = ("project_name", "token", "amount", "unlock_date", "info", "url", "date", "source_count",
+                 "kind", "amount_value", "change_pct")
+    FIELDS = ("project_name", "token", "amount", "unlock_date", "info", "url", "date", "source_count")
+
+    def __init__(self, project_name: str = "Unknown", token=None, amount=None, unlock_date=None,
+                 info=None, url=None, date=None, source_count=None, kind: str = "rootdata",
+                 amount_value=None, change_pct=None):
+        self.project_name = project_name or "Unknown"
+        self.token = token
+        self.amount = amount
+        self.unlock_date = unlock_date
+        self.info = info
+        self.url = url
+        self.date = date
+        self.source_count = source_count
+        self.kind = kind
+        self.amount_value = _float(amount_value) if amount_value is not None else (
+            parse_amount(amount) if kind == "rootdata" else 0.0)
+        self.change_pct = _float(change_pct) if change_pct is not None else None
+
+
+class AirdropItem(Record):
+    __slots__ = ("project_name", "status", "info", "url", "date", "source_count", "kind")
+    FIELDS = ("project_name", "status", "info", "url", "date", "source_count")
+
+    def __init__(self, project_name: str = "Unknown", status=None, info=None, url=None, date=None,
+                 source_count=None, kind: str = "rootdata"):
+        self.project_name = project_name or "Unknown"
+        self.status = status
+        self.info = info
+        self.url = url
+        self.date = date
+        self.source_count = source_count
+        self.kind = kind
+
+
+# 报告数据键 -> 记录类型 (用于断点 JSON 还原)
+RECORD_TYPES = {
+    "markets": MarketQuote,
+    "trending": TrendingCoin,
+    "news": NewsItem,
+    "fund": FundingRound,
+    "air": AirdropItem,
+    "unl": UnlockEvent,
+}
+
+
+def hydrate(data: Dict) -> Dict:
+    """把断点读回的 dict 列表还原成记录对象 (已是记录的原样保留)"""
+    return {
+        key: [RECORD_TYPES[key].from_dict(x) for x in rows] if key in RECORD_TYPES else rows
+        for key, rows in data.items()
+    }
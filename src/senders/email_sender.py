@@ -1,10 +1,13 @@
 import smtplib
+import gzip
 import os
+from contextlib import contextmanager
+from typing import Callable, Optional
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.application import MIMEApplication
 
-def send_email(subject: str, body: str, env: dict, from_name: str = "Web3 Reporter", attachments: list = None) -> None:
+def _smtp_settings(env: dict) -> dict:
     host = env.get("EMAIL_SMTP_HOST")
     
     # [修复 1] 确保端口是整数 (int)，防止 ValueError
@@ -15,23 +18,15 @@ def send_email(subject: str, body: str, env: dict, from_name: str = "Web3 Report
 
     username = (env.get("EMAIL_USERNAME") or "").strip()
     password = (env.get("EMAIL_PASSWORD") or "").strip()
-    to_addr = (env.get("EMAIL_TO") or "").strip()
 
     # [修复 2] 修复 SSL 判断逻辑，防止 "false" 字符串被误判为 True
     use_ssl_str = str(env.get("EMAIL_USE_SSL", "")).lower()
     use_ssl = use_ssl_str in ("true", "1", "yes", "on") or port == 465
+    return {"host": host, "port": port, "username": username, "password": password, "use_ssl": use_ssl}
 
-    # 检查必要参数
-    missing = [k for k, v in {
-        "EMAIL_SMTP_HOST": host,
-        "EMAIL_USERNAME": username,
-        "EMAIL_PASSWORD": password,
-        "EMAIL_TO": to_addr,
-    }.items() if not v]
-    
-    if missing:
-        raise RuntimeError(f"邮件发送缺少必要的环境变量: {', '.join(missing)}")
 
+def _build_message(subject: str, body: str, username: str, to_addr: str, from_name: str, attachments: list,
+                   gzip_attachments: bool = False) -> MIMEMultipart:
     msg = MIMEMultipart()
     # 使用“显示名 <邮箱地址>”的格式
     msg["From"] = f"{from_name} <{username}>"
@@ -54,25 +49,34 @@ def send_email(subject: str, body: str, env: dict, from_name: str = "Web3 Report
             file_name = os.path.basename(fn)
             
             with open(fn, "rb") as f:
-                part = MIMEApplication(f.read())
-                part.add_header("Content-Disposition", "attachment", filename=file_name)
-                msg.attach(part)
+                payload = f.read()
+            # 可选 gzip 压缩附件，大报告体积可缩小数倍
+            if gzip_attachments:
+                payload = gzip.compress(payload, compresslevel=9)
+                file_name += ".gz"
+            part = MIMEApplication(payload)
+            part.add_header("Content-Disposition", "attachment", filename=file_name)
+            msg.attach(part)
         except Exception as ex:
             print(f"[WARN] 附件读取失败，已跳过: {fp} - {ex}")
+    return msg
 
-    # 发送邮件
+
+@contextmanager
+def _smtp_session(settings: dict):
+    """建立并登录 SMTP 连接，统一转换异常信息"""
     try:
-        if use_ssl:
+        if settings["use_ssl"]:
             # SSL 模式 (通常是 465 端口)
-            with smtplib.SMTP_SSL(host, port) as server:
-                server.login(username, password)
-                server.sendmail(username, [to_addr], msg.as_string())
+            server = smtplib.SMTP_SSL(settings["host"], settings["port"])
         else:
             # TLS 模式 (通常是 587 端口)
-            with smtplib.SMTP(host, port) as server:
+            server = smtplib.SMTP(settings["host"], settings["port"])
+        with server:
+            if not settings["use_ssl"]:
                 server.starttls() # 只有非 SSL 连接才需要 starttls
-                server.login(username, password)
-                server.sendmail(username, [to_addr], msg.as_string())
+            server.login(settings["username"], settings["password"])
+            yield server
                 
     except smtplib.SMTPAuthenticationError as e:
         # 优化错误信息提取
@@ -83,3 +87,60 @@ def send_email(subject: str, body: str, env: dict, from_name: str = "Web3 Report
         raise RuntimeError(f"SMTP 发送错误: {err_msg}")
     except Exception as e:
         raise RuntimeError(f"发送邮件时发生未知错误: {str(e)}")
+
+
+def send_email(subject: str, body: str, env: dict, from_name: str = "Web3 Reporter", attachments: list = None,
+               gzip_attachments: bool = False) -> None:
+    settings = _smtp_settings(env)
+    to_addr = (env.get("EMAIL_TO") or "").strip()
+
+    # 检查必要参数
+    missing = [k for k, v in {
+        "EMAIL_SMTP_HOST": settings["host"],
+        "EMAIL_USERNAME": settings["username"],
+        "EMAIL_PASSWORD": settings["password"],
+        "EMAIL_TO": to_addr,
+    }.items() if not v]
+    
+    if missing:
+        raise RuntimeError(f"邮件发送缺少必要的环境变量: {', '.join(missing)}")
+
+    msg = _build_message(subject, body, settings["username"], to_addr, from_name, attachments, gzip_attachments)
+
+    # 发送邮件
+    with _smtp_session(settings) as server:
+        server.sendmail(settings["username"], [to_addr], msg.as_string())
+
+
+def send_emails(messages: list, env: dict, from_name: str = "Web3 Reporter", gzip_attachments: bool = False,
+                on_sent: Optional[Callable[[dict], None]] = None) -> list:
+    """批量发送：复用同一个 SMTP 连接发送多封邮件。
+    messages 中每项包含 to, subject, body, attachments；返回发送失败的 (to, 错误信息) 列表。
+    on_sent 在每封邮件发送成功后立即回调，便于中途断开时保留已发送进度。
+    """
+    settings = _smtp_settings(env)
+    missing = [k for k, v in {
+        "EMAIL_SMTP_HOST": settings["host"],
+        "EMAIL_USERNAME": settings["username"],
+        "EMAIL_PASSWORD": settings["password"],
+    }.items() if not v]
+    if missing:
+        raise RuntimeError(f"邮件发送缺少必要的环境变量: {', '.join(missing)}")
+
+    failed = []
+    with _smtp_session(settings) as server:
+        for m in messages:
+            to_addr = (m.get("to") or "").strip()
+            if not to_addr:
+                failed.append((to_addr, "缺少收件人"))
+                continue
+            msg = _build_message(m["subject"], m["body"], settings["username"], to_addr, from_name, m.get("attachments"),
+                                 gzip_attachments)
+            try:
+                server.sendmail(settings["username"], [to_addr], msg.as_string())
+            except smtplib.SMTPException as e:
+                failed.append((to_addr, str(getattr(e, "smtp_error", e))))
+                continue
+            if on_sent:
+                on_sent(m)
+    return failed
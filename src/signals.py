@@ -0,0 +1,359 @@
+import json
+import operator
+import os
+from datetime import datetime, timezone
+from typing import Dict, List
+
+import numpy as np
+
+# --- 信号规则引擎 ---
+# 规则在配置中声明 (config.yaml 的 signal_rules)，编译成对列式数组的向量化谓词。
+# 每张表只构建一次列，所有规则在一次遍历中求出命中掩码，再按分数排序输出。
+#
+# 规则示例:
+#   - name: deep_dip
+#     table: markets                 # markets | trending | news | fund | air | unl
+#     when: [["change_24h", "<", -8]] # 多个条件为 AND
+#     head: 3                        # 可选：只看表的前 N 行
+#     score: 3                       # 基础分
+#     score_by: change_24h           # 可选：分数乘以该列绝对值
+#     label: "📉超卖"
+#     template: "<b>{symbol}</b>: 24H跌幅 {change_24h:.2f}%"
+#     group: drop                    # 可选：同组规则对同一币种/项目只保留分数最高的一条
+
+_OPS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+DEFAULT_RULES = [
+    # 与旧版硬编码建议一致的规则
+    {"name": "hot_trending", "table": "fund", "head": 3, "when": [["kind", "==", "trending"]],
+     "score": 2, "label": "🔥热门", "template": "<b>{project_name}</b>: 社区热度高，位列 {amount}。"},
+    {"name": "big_raise", "table": "fund", "head": 3, "when": [["amount_usd", ">", 5000000]],
+     "score": 3, "label": "💰融资", "template": "<b>{project_name}</b>: 获得大额融资 {amount}。"},
+    {"name": "news_fund", "table": "fund", "head": 3, "when": [["kind", "==", "news"]],
+     "score": 1, "label": "📰关注", "template": "<b>{info}</b>"},
+    {"name": "airdrop_news", "table": "air", "head": 3, "when": [["kind", "==", "news"]],
+     "score": 1, "label": "🪂空投", "template": "<b>{project_name}</b>: {info}。"},
+    {"name": "airdrop", "table": "air", "head": 3, "when": [["kind", "!=", "news"]],
+     "score": 1, "label": "🪂空投", "template": "<b>{project_name}</b>: 出现相关信号。"},
+    {"name": "dip", "table": "unl", "head": 3, "when": [["kind", "==", "dip"]], "group": "drop",
+     "score": 2, "label": "📉超卖", "template": "<b>{project_name}</b>: 24H跌幅 {change_pct:.2f}%，注意风险或反弹。"},
+    {"name": "unlock", "table": "unl", "head": 3, "when": [["kind", "!=", "dip"], ["kind", "!=", "news"]],
+     "score": 2, "label": "⚠️解锁", "template": "<b>{project_name}</b>: 即将解锁 {amount}。"},
+    {"name": "unlock_news", "table": "unl", "head": 3, "when": [["kind", "==", "news"]],
+     "score": 2, "label": "⚠️解锁", "template": "<b>{project_name}</b>: {info}"},
+    # 基于行情与历史的规则
+    {"name": "crash", "table": "markets", "when": [["change_24h", "<", -10]], "group": "drop",
+     "score": 0.3, "score_by": "change_24h", "label": "📉急跌", "template": "<b>{symbol}</b>: 24H {change_24h:.1f}%。"},
+    {"name": "rank_jump", "table": "markets", "when": [["rank_change", ">=", 10]],
+     "score": 0.2, "score_by": "rank_change", "label": "🚀排名跃升", "template": "<b>{symbol}</b>: 市值排名上升 {rank_change:.0f} 位至 #{rank}。"},
+    {"name": "volume_spike", "table": "markets", "when": [["volume_ratio", ">=", 3]],
+     "score": 1, "score_by": "volume_ratio", "label": "📊放量", "template": "<b>{symbol}</b>: 成交量为近期均值的 {volume_ratio:.1f} 倍。"},
+    {"name": "unlock_soon_large", "table": "unl", "when": [["days_until", "<=", 7], ["supply_pct", ">", 1]],
+     "score": 4, "score_by": "supply_pct", "label": "⏰大额解锁", "template": "<b>{project_name}</b>: {days_until:.0f} 天内解锁流通量的 {supply_pct:.1f}%。"},
+]
+
+
+class Signal:
+    __slots__ = ("rule", "label", "score", "text", "table", "index")
+
+    def __init__(self, rule: str, label: str, score: float, text: str, table: str, index: int):
+        self.rule = rule
+        self.label = label
+        self.score = score
+        self.text = text
+        self.table = table
+        self.index = index
+
+    def __str__(self):
+        return f"[{self.label}] {self.text}"
+
+
+def _days_until(date_str, now: datetime) -> float:
+    """解锁日期 -> 距今天数，无法解析时为 nan"""
+    if not date_str:
+        return np.nan
+    try:
+        if isinstance(date_str, (int, float)) or str(date_str).isdigit():
+            ts = float(date_str)
+            dt = datetime.fromtimestamp(ts / 1000 if ts > 1e11 else ts, tz=timezone.utc)
+        else:
+            dt = datetime.fromisoformat(str(date_str).replace("Z", "+00:00"))
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)
+        return (dt - now).total_seconds() / 86400
+    except (ValueError, OverflowError, OSError):
+        return np.nan
+
+
+_ORDERING = ("<", "<=", ">", ">=")
+_SCHEMA: Dict[str, Dict[str, bool]] = {}
+
+
+def _schema() -> Dict[str, Dict[str, bool]]:
+    """各表可用列 -> 是否数值列 (由空数据构建一次列得到，与 build_columns 保持一致)"""
+    if not _SCHEMA:
+        for table, cols in build_columns({}).items():
+            _SCHEMA[table] = {c: arr.dtype != object for c, arr in cols.items()}
+    return _SCHEMA
+
+
+def _num(values) -> np.ndarray:
+    return np.array([np.nan if v is None else v for v in values], dtype=float)
+
+
+def build_columns(data: Dict, history: Dict = None) -> Dict[str, Dict[str, np.ndarray]]:
+    """把各板块记录转成列式数组，并补充派生列 (排名变化、放量倍数、解锁占比等)"""
+    history = history or {}
+    now = datetime.now(timezone.utc)
+    tables: Dict[str, Dict[str, np.ndarray]] = {}
+
+    markets = data.get("markets") or []
+    ranks = _num([m.rank if m.rank is not None else i + 1 for i, m in enumerate(markets)])
+    prev = [history.get(m.symbol) or {} for m in markets]
+    vol_avg = _num([p.get("volume_avg") for p in prev])
+    volume = _num([m.volume for m in markets])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        volume_ratio = np.where(vol_avg > 0, volume / vol_avg, np.nan)
+    tables["markets"] = {
+        "symbol": np.array([m.symbol for m in markets], dtype=object),
+        "price": _num([m.price for m in markets]),
+        "change_24h": _num([m.change_24h for m in markets]),
+        "market_cap": _num([m.market_cap for m in markets]),
+        "rank": ranks,
+        "volume": volume,
+        "rank_change": _num([p.get("rank") for p in prev]) - ranks,
+        "volume_ratio": volume_ratio,
+    }
+
+    trending = data.get("trending") or []
+    tables["trending"] = {
+        "name": np.array([t.name for t in trending], dtype=object),
+        "symbol": np.array([t.symbol for t in trending], dtype=object),
+        "rank": _num([t.rank for t in trending]),
+        "score": _num([t.score for t in trending]),
+    }
+
+    news = data.get("news") or []
+    tables["news"] = {
+        "title": np.array([n.title for n in news], dtype=object),
+        "currencies": np.array([n.currencies for n in news], dtype=object),
+        "source_count": _num([n.source_count for n in news]),
+    }
+
+    fund = data.get("fund") or []
+    tables["fund"] = {
+        "project_name": np.array([f.project_name for f in fund], dtype=object),
+        "kind": np.array([f.kind for f in fund], dtype=object),
+        "amount_usd": _num([f.amount_usd for f in fund]),
+        "rank": _num([f.rank for f in fund]),
+        "source_count": _num([f.source_count for f in fund]),
+    }
+
+    air = data.get("air") or []
+    tables["air"] = {
+        "project_name": np.array([a.project_name for a in air], dtype=object),
+        "kind": np.array([a.kind for a in air], dtype=object),
+        "source_count": _num([a.source_count for a in air]),
+    }
+
+    unl = data.get("unl") or []
+    supply = {m.symbol: m.circulating_supply for m in markets if m.circulating_supply}
+    circ = _num([supply.get(str(u.token or "").upper()) for u in unl])
+    amount_value = _num([u.amount_value for u in unl])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        supply_pct = np.where(circ > 0, amount_value / circ * 100, np.nan)
+    tables["unl"] = {
+        "project_name": np.array([u.project_name for u in unl], dtype=object),
+        "token": np.array([u.token for u in unl], dtype=object),
+        "kind": np.array([u.kind for u in unl], dtype=object),
+        "amount_value": amount_value,
+        "change_pct": _num([u.change_pct for u in unl]),
+        "days_until": _num([_days_until(u.unlock_date, now) for u in unl]),
+        "supply_pct": supply_pct,
+    }
+    return tables
+
+
+class CompiledRule:
+    __slots__ = ("name", "table", "conds", "head", "score", "score_by", "label", "template", "group")
+
+    def __init__(self, spec: Dict):
+        self.name = spec.get("name") or "rule"
+        self.table = spec["table"]
+        columns = _schema().get(self.table)
+        if columns is None:
+            raise ValueError(f"未知的表: {self.table}")
+        self.conds = []
+        for col, op, value in spec.get("when") or []:
+            if op not in _OPS:
+                raise ValueError(f"不支持的运算符: {op}")
+            if col not in columns:
+                raise ValueError(f"表 {self.table} 没有列 {col} (可用: {', '.join(columns)})")
+            is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+            if columns[col] and not is_number:
+                raise ValueError(f"{col} 是数值列，不能与 {value!r} 比较")
+            if not columns[col] and op in _ORDERING and not isinstance(value, str):
+                raise ValueError(f"{col} 是文本列，不能用 {op} 与 {value!r} 比较")
+            self.conds.append((col, _OPS[op], value))
+        self.head = spec.get("head")
+        self.score = float(spec.get("score", 1))
+        self.score_by = spec.get("score_by")
+        self.label = spec.get("label") or self.name
+        self.template = spec.get("template") or "<b>{project_name}</b>"
+        self.group = spec.get("group")
+
+    def mask(self, cols: Dict[str, np.ndarray], n: int) -> np.ndarray:
+        m = np.ones(n, dtype=bool)
+        if self.head is not None:
+            m[int(self.head):] = False
+        for col, op, value in self.conds:
+            arr = cols[col]
+            # object 列逐元素比较同样由 numpy 完成；nan 与任何数比较都为 False
+            with np.errstate(invalid="ignore"):
+                m &= np.asarray(op(arr, value), dtype=bool)
+        return m
+
+    def scores(self, cols: Dict[str, np.ndarray], idx: np.ndarray) -> np.ndarray:
+        base = np.full(len(idx), self.score)
+        if self.score_by and self.score_by in cols and cols[self.score_by].dtype != object:
+            mag = np.abs(cols[self.score_by][idx])
+            base = np.where(np.isnan(mag), base, base * mag)
+        return base
+
+
+def compile_rules(specs: List[Dict]) -> List[CompiledRule]:
+    """编译规则；配置有误的规则打印警告后跳过"""
+    rules = []
+    for spec in specs or []:
+        try:
+            rules.append(CompiledRule(spec))
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"[WARN] 信号规则无效，已跳过: {spec} - {e}")
+    return rules
+
+
+def _render(rule: CompiledRule, record, cols: Dict[str, np.ndarray], i: int) -> str:
+    ctx = {k: v for k, v in record.to_dict().items() if v is not None} if record is not None else {}
+    for k, arr in cols.items():
+        ctx.setdefault(k, arr[i])
+    try:
+        return rule.template.format_map(ctx)
+    except (KeyError, ValueError, TypeError, IndexError):
+        return f"<b>{ctx.get('project_name') or ctx.get('symbol') or ''}</b>"
+
+
+def _subject(record) -> str:
+    return str(record.get("symbol") or record.get("project_name") or "").upper()
+
+
+def evaluate(data: Dict, rules: List[CompiledRule], history: Dict = None, limit: int = None) -> List[Signal]:
+    """一次遍历所有规则，返回按分数降序的信号 (同分保持规则声明顺序)。
+
+    各规则的命中 (分数 / 规则序号 / 行号) 拼成数组后用 numpy 排序；设置 limit 时
+    只对分数进入前 limit 名 (含并列) 的候选排序，也只为最终输出的信号渲染文本。
+    """
+    tables = build_columns(data, history)
+    scores, rule_ids, rows = [], [], []
+    for pos, rule in enumerate(rules):
+        cols = tables.get(rule.table)
+        if cols is None:
+            continue
+        n = len(data.get(rule.table) or [])
+        if not n:
+            continue
+        try:
+            idx = np.flatnonzero(rule.mask(cols, n))
+        except (TypeError, ValueError) as e:
+            # 单条规则出错 (如文本列里混入 None) 不影响其它规则与简报
+            print(f"[WARN] 信号规则 {rule.name} 求值失败，已跳过: {e}")
+            continue
+        if not len(idx):
+            continue
+        scores.append(rule.scores(cols, idx))
+        rule_ids.append(np.full(len(idx), pos))
+        rows.append(idx)
+    if not scores:
+        return []
+    scores = np.concatenate(scores)
+    rule_ids = np.concatenate(rule_ids)
+    rows = np.concatenate(rows)
+    total = len(scores)
+
+    def ranked(k: int) -> np.ndarray:
+        """分数前 k 名 (含与第 k 名并列者) 的下标，按 (-分数, 命中顺序) 排好"""
+        if k >= total:
+            cand = np.arange(total)
+        else:
+            kth = np.partition(-scores, k - 1)[k - 1]
+            cand = np.flatnonzero(-scores <= kth)
+        # 命中数组本身就是规则声明顺序，稳定排序即可保持同分次序
+        return cand[np.argsort(-scores[cand], kind="stable")]
+
+    # 同组规则 (如 crash / dip) 对同一币种只保留分数最高的一条；
+    # 去重可能丢掉候选，取不够 limit 条时扩大候选范围重来
+    k = limit or total
+    while True:
+        seen = set()
+        picked = []
+        order = ranked(k)
+        for h in order.tolist():
+            rule = rules[rule_ids[h]]
+            if rule.group:
+                key = (rule.group, _subject(data[rule.table][rows[h]]))
+                if key in seen:
+                    continue
+                seen.add(key)
+            picked.append(h)
+            if limit and len(picked) >= limit:
+                break
+        if not limit or len(picked) >= limit or len(order) >= total:
+            break
+        k *= 2
+
+    out = []
+    for h in picked:
+        rule, i = rules[rule_ids[h]], int(rows[h])
+        out.append(Signal(rule.name, rule.label, float(scores[h]),
+                          _render(rule, data[rule.table][i], tables[rule.table], i), rule.table, i))
+    return out
+
+
+def load_rules(cfg: Dict) -> List[CompiledRule]:
+    return compile_rules(cfg.get("signal_rules") or DEFAULT_RULES)
+
+
+# --- 行情历史 (排名变化 / 放量判断的基准) ---
+
+def load_history(path: str) -> Dict:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f) or {}
+    except Exception:
+        return {}
+
+
+def update_history(path: str, history: Dict, markets: List, alpha: float = 0.3) -> Dict:
+    """用本次行情更新历史：排名取最新值，成交量取指数移动平均"""
+    updated = dict(history)
+    for i, m in enumerate(markets):
+        prev = history.get(m.symbol) or {}
+        avg = prev.get("volume_avg")
+        updated[m.symbol] = {
+            "rank": m.rank if m.rank is not None else i + 1,
+            "volume_avg": m.volume if not avg else avg * (1 - alpha) + m.volume * alpha,
+        }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(updated, f, ensure_ascii=False)
+    os.replace(tmp, path)
+    return updated
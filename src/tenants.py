@@ -0,0 +1,167 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+from src.signals import DEFAULT_RULES, compile_rules
+from src.summarize import generate_market_analysis
+
+# --- 多订阅者模式 ---
+# 抓取与整理只做一次，之后每个订阅者按自己的关注列表过滤、生成简报与报告。
+# 渲染在进程池中并行执行；共享数据通过 initializer 只传给每个 worker 一次。
+
+# 订阅者可选的板块 -> (数据键, 报告 tab 名)
+CATEGORIES = {
+    "market": ("markets", "0.市场行情"),
+    "news": ("news", "1.舆情热点"),
+    "fund": ("fund", "2.融资/热门"),
+    "air": ("air", "3.潜在空投"),
+    "unl": ("unl", "4.解锁/风险"),
+    "trending": ("trending", "5.今日热搜"),
+}
+
+# 目前只实现了邮件投递 (src.senders)
+SUPPORTED_CHANNELS = ("email",)
+
+_SHARED: Dict = {}
+
+
+class Subscriber:
+    """订阅者画像：关注币种、关键词、板块与投递通道"""
+
+    def __init__(self, name: str, watchlist: List[str] = None, keywords: List[str] = None,
+                 trigger_keywords: List[str] = None, categories: List[str] = None, channel: Dict = None):
+        self.name = name
+        self.watchlist = [s.upper() for s in watchlist or []]
+        self.keywords = [k.lower() for k in keywords or []]
+        self.trigger_keywords = [k.lower() for k in trigger_keywords or []]
+        self.categories = [c for c in categories or CATEGORIES if c in CATEGORIES]
+        self.channel = channel or {}
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "Subscriber":
+        return cls(
+            name=d.get("name") or d.get("id") or "anonymous",
+            watchlist=d.get("watchlist"),
+            keywords=d.get("keywords"),
+            trigger_keywords=d.get("trigger_keywords"),
+            categories=d.get("categories"),
+            channel=d.get("channel"),
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "watchlist": self.watchlist,
+            "keywords": self.keywords,
+            "trigger_keywords": self.trigger_keywords,
+            "categories": self.categories,
+            "channel": self.channel,
+        }
+
+    @property
+    def slug(self) -> str:
+        return re.sub(r"[^0-9A-Za-z_-]+", "_", self.name) or "anonymous"
+
+    @property
+    def email_to(self) -> str:
+        if self.channel.get("type", "email") != "email":
+            return ""
+        return self.channel.get("to", "")
+
+
+def load_subscribers(cfg: dict) -> List[Subscriber]:
+    """从配置的 subscribers 列表读取订阅者"""
+    return [Subscriber.from_dict(d) for d in cfg.get("subscribers") or [] if isinstance(d, dict)]
+
+
+def check_channels(subscribers: List[Subscriber]) -> List[str]:
+    """返回无法投递的订阅者说明 (不支持的通道、缺少收件人、重名或目录名冲突)"""
+    problems = []
+    names, slugs = {}, {}
+    for sub in subscribers:
+        # 发送进度按名字记录、报告按 slug 分目录，两者都必须唯一
+        if sub.name in names:
+            problems.append(f"{sub.name}: 与其它订阅者重名")
+        elif sub.slug in slugs:
+            problems.append(f"{sub.name}: 目录名 {sub.slug} 与 {slugs[sub.slug]} 冲突")
+        names[sub.name] = True
+        slugs.setdefault(sub.slug, sub.name)
+        kind = sub.channel.get("type", "email")
+        if kind not in SUPPORTED_CHANNELS:
+            problems.append(f"{sub.name}: 不支持的投递通道 {kind!r} (可用: {', '.join(SUPPORTED_CHANNELS)})")
+        elif not sub.email_to:
+            problems.append(f"{sub.name}: 缺少收件人 channel.to")
+    return problems
+
+
+def _matches(text: str, sub: Subscriber) -> bool:
+    low = text.lower()
+    if any(k in low for k in sub.keywords) or any(k in low for k in sub.trigger_keywords):
+        return True
+    # 币种代码按完整单词匹配，避免 "OP" 命中 "OPEN"
+    upper_tokens = set(re.findall(r"[A-Z0-9]+", text.upper()))
+    return any(sym in upper_tokens for sym in sub.watchlist)
+
+
+def filter_for(data: Dict, sub: Subscriber) -> Dict:
+    """按订阅者画像过滤共享数据；未配置任何关注条件时保留全部"""
+    has_filter = bool(sub.watchlist or sub.keywords or sub.trigger_keywords)
+    out = {key: [] for key, _ in CATEGORIES.values()}
+    for cat in sub.categories:
+        key, _ = CATEGORIES[cat]
+        rows = data.get(key) or []
+        if not has_filter or key == "trending":
+            out[key] = list(rows)
+        elif key == "markets":
+            out[key] = [m for m in rows if not sub.watchlist or m.symbol in sub.watchlist]
+        else:
+            out[key] = [r for r in rows if _matches(" ".join(str(v) for v in r.values()), sub)]
+    return out
+
+
+def _init_worker(shared: Dict, output_dir: str, rule_specs: List[Dict] = None, history: Dict = None,
+                 report_format: str = "full") -> None:
+    _SHARED["data"] = shared
+    _SHARED["output_dir"] = output_dir
+    _SHARED["report_format"] = report_format
+    # 规则在每个 worker 内只编译一次
+    _SHARED["rules"] = compile_rules(rule_specs or DEFAULT_RULES)
+    _SHARED["history"] = history or {}
+
+
+def render_for(sub_dict: Dict) -> Dict:
+    """worker 内执行：过滤 + 简报 + HTML 报告"""
+    # 延迟导入，避免与 src.main 循环引用
+    from src.main import REPORT_WRITERS, build_email_body
+
+    sub = Subscriber.from_dict(sub_dict)
+    data = filter_for(_SHARED["data"], sub)
+    summary_html = generate_market_analysis(
+        data["fund"], data["air"], data["unl"], data["trending"], data["markets"], data["news"],
+        rules=_SHARED["rules"], history=_SHARED["history"],
+    )
+    tabs = {CATEGORIES[c][1]: data[CATEGORIES[c][0]] for c in sub.categories}
+    write_report = REPORT_WRITERS[_SHARED["report_format"]]
+    report_path = write_report(tabs, os.path.join(_SHARED["output_dir"], "subscribers", sub.slug))
+    return {
+        "name": sub.name,
+        "to": sub.email_to,
+        "subject": f"🚀 Web3 日报 ({sub.name}): {len(data['news'])}条热点 | {len(data['fund'])}个重点项目",
+        "body": build_email_body(summary_html),
+        "attachments": [report_path] if report_path else [],
+    }
+
+
+def render_all(data: Dict, subscribers: List[Subscriber], output_dir: str = "output", max_workers: int = None,
+               rule_specs: List[Dict] = None, history: Dict = None, report_format: str = "full") -> List[Dict]:
+    """并行为所有订阅者渲染，返回待发送的邮件列表 (顺序与订阅者一致)"""
+    if not subscribers:
+        return []
+    payload = [s.to_dict() for s in subscribers]
+    workers = max_workers or min(len(subscribers), os.cpu_count() or 1)
+    if workers <= 1:
+        _init_worker(data, output_dir, rule_specs, history, report_format)
+        return [render_for(p) for p in payload]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data, output_dir, rule_specs, history, report_format)) as pool:
+        return list(pool.map(render_for, payload))
@@ -0,0 +1,38 @@
+from src.dedup import cluster_near_duplicates
+from src.records import NewsItem
+
+
+def test_reworded_headline_is_merged():
+    items = [
+        {"title": "Bitcoin ETF sees record inflows on Monday"},
+        {"title": "Bitcoin ETFs see record inflows Monday"},
+    ]
+    out = cluster_near_duplicates(items)
+    assert len(out) == 1
+    assert out[0]["source_count"] == 2
+
+
+def test_different_tickers_are_not_merged():
+    items = [
+        NewsItem(title="Coinbase lists new token PEPE"),
+        NewsItem(title="Coinbase lists new token BONK"),
+    ]
+    out = cluster_near_duplicates(items)
+    assert [n.title for n in out] == [n.title for n in items]
+    assert all(n.source_count == 1 for n in out)
+
+
+def test_currencies_field_takes_precedence():
+    items = [
+        {"title": "Exchange lists new token", "currencies": [{"code": "PEPE"}]},
+        {"title": "Exchange lists new token", "currencies": [{"code": "BONK"}]},
+    ]
+    assert len(cluster_near_duplicates(items)) == 2
+
+
+def test_different_projects_are_not_merged():
+    items = [
+        {"title": "Ethereum upgrade goes live on mainnet"},
+        {"title": "Solana upgrade goes live on mainnet"},
+    ]
+    assert len(cluster_near_duplicates(items)) == 2